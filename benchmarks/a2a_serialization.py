@@ -0,0 +1,174 @@
+"""Serialization and validation throughput of the A2A types.
+
+Compares the server's previous path (`model_dump` then `json.dumps`, as done
+by JSONResponse) with `model_dump_json` and `dump_json`, request parsing
+with `json.loads` plus `validate_python` against `validate_json`, and
+streaming one event to many subscribers with a `model_dump_json` per
+subscriber against freezing it with `freeze_json` and splicing it in with
+`dump_json_rpc_response`.
+
+    python -m benchmarks.a2a_serialization --iterations 20000
+"""
+
+import argparse
+import json
+import time
+
+from collections.abc import Callable
+from functools import partial
+
+from common.types import (
+    A2ARequest,
+    AgentCapabilities,
+    AgentCard,
+    AgentSkill,
+    Artifact,
+    GetTaskResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskStreamingResponse,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from common.utils.serialization import (
+    dump_json,
+    dump_json_rpc_response,
+    freeze_json,
+)
+
+
+def message(i: int) -> Message:
+    return Message(
+        role='user' if i % 2 == 0 else 'agent',
+        parts=[TextPart(text=f'message {i} ' + 'lorem ipsum ' * 8)],
+    )
+
+
+def samples() -> dict[str, object]:
+    artifact = Artifact(
+        name='report',
+        parts=[TextPart(text='result ' * 200)],
+        lastChunk=True,
+    )
+    status = TaskStatus(state=TaskState.COMPLETED, message=message(1))
+    return {
+        'AgentCard': AgentCard(
+            name='Example agent',
+            description='An agent used for benchmarking.',
+            url='http://localhost:10000/',
+            version='1.0.0',
+            capabilities=AgentCapabilities(streaming=True),
+            skills=[
+                AgentSkill(
+                    id=f'skill-{i}',
+                    name=f'Skill {i}',
+                    description='Does something useful.',
+                    tags=['example', 'benchmark'],
+                    examples=['Do the thing', 'Do the other thing'],
+                )
+                for i in range(5)
+            ],
+        ),
+        'GetTaskResponse': GetTaskResponse(
+            id=1,
+            result=Task(
+                id='task-1',
+                sessionId='session-1',
+                status=status,
+                artifacts=[artifact],
+                history=[message(i) for i in range(10)],
+            ),
+        ),
+        'TaskStatusUpdateEvent': TaskStatusUpdateEvent(
+            id='task-1', status=status, final=True
+        ),
+        'TaskArtifactUpdateEvent': TaskArtifactUpdateEvent(
+            id='task-1', artifact=artifact
+        ),
+    }
+
+
+def rate(func: Callable[[], object], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20_000)
+    parser.add_argument('--subscribers', type=int, default=50)
+    args = parser.parse_args()
+
+    paths = {
+        'dump+dumps': lambda model: json.dumps(
+            model.model_dump(exclude_none=True),
+            ensure_ascii=False,
+            separators=(',', ':'),
+        ).encode(),
+        'model_dump_json': lambda model: model.model_dump_json(
+            exclude_none=True
+        ),
+        'dump_json': dump_json,
+    }
+    print(f'{args.iterations} iterations, objects/s')
+    print(f'{"":<26}' + ''.join(f'{name:>16}' for name in paths))
+    for name, model in samples().items():
+        rates = [
+            rate(partial(path, model), args.iterations)
+            for path in paths.values()
+        ]
+        print(f'{name:<26}' + ''.join(f'{r:>16.0f}' for r in rates))
+
+    body = dump_json(
+        SendTaskRequest(
+            id=1, params=TaskSendParams(id='task-1', message=message(0))
+        )
+    )
+    parsers = {
+        'loads+validate_python': lambda: A2ARequest.validate_python(
+            json.loads(body)
+        ),
+        'validate_json': lambda: A2ARequest.validate_json(body),
+    }
+    print()
+    for name, parse in parsers.items():
+        print(f'{name:<26}{rate(parse, args.iterations):>16.0f} requests/s')
+
+    artifact = samples()['TaskArtifactUpdateEvent'].artifact
+
+    def fan_out(
+        serialize: Callable[[SendTaskStreamingResponse], bytes], freeze: bool
+    ):
+        # A fresh event per round, as a task manager publishes it.
+        event = TaskArtifactUpdateEvent(id='task-1', artifact=artifact)
+        if freeze:
+            freeze_json(event)
+        for request_id in range(args.subscribers):
+            serialize(SendTaskStreamingResponse(id=request_id, result=event))
+
+    fan_outs = {
+        'model_dump_json': (
+            lambda response: response.model_dump_json(
+                exclude_none=True
+            ).encode(),
+            False,
+        ),
+        'freeze+splice': (dump_json_rpc_response, True),
+    }
+    rounds = max(args.iterations // args.subscribers, 1)
+    print()
+    print(f'one event streamed to {args.subscribers} subscribers')
+    for name, (serialize, freeze) in fan_outs.items():
+        events = rate(partial(fan_out, serialize, freeze), rounds)
+        print(f'{name:<26}{events:>16.0f} events/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""InMemoryCache throughput under multi-threaded access.
+
+Each thread runs a 90% get / 10% set mix over a shared key space against
+the cache (a single lock) and against the same store split into 16
+hash-partitioned shards with a lock each. Under the GIL sharding gives no
+measurable gain, which is why the cache keeps a single lock; rerun this
+on a free-threaded build before revisiting that.
+
+    python -m benchmarks.in_memory_cache_contention --ops 200000
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from typing import Any
+
+from common.utils.in_memory_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_ENTRIES,
+    InMemoryCache,
+    _CacheStore,
+)
+
+
+SHARDS = 16
+
+
+class ShardedStore:
+    """Minimal sharded layout; each shard holds its share of the limits."""
+
+    def __init__(self, shards: int):
+        self._shards = [
+            _CacheStore(
+                DEFAULT_MAX_ENTRIES // shards, DEFAULT_MAX_BYTES // shards
+            )
+            for _ in range(shards)
+        ]
+
+    def set(self, key: str, value: Any):
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        self._shards[hash(key) % len(self._shards)].set(key, value, size, None)
+
+    def get(self, key: str) -> Any:
+        return self._shards[hash(key) % len(self._shards)].get(key, None)
+
+
+def run(cache, threads: int, ops: int, keys: list[str]) -> float:
+    per_thread = ops // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        choices = [rng.choice(keys) for _ in range(per_thread)]
+        writes = [rng.random() < 0.1 for _ in range(per_thread)]
+        barrier.wait()
+        for key, write in zip(choices, writes):
+            if write:
+                cache.set(key, key)
+            else:
+                cache.get(key)
+
+    workers = [
+        threading.Thread(target=worker, args=(seed,)) for seed in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=200_000)
+    parser.add_argument('--keys', type=int, default=5_000)
+    args = parser.parse_args()
+
+    keys = [f'key-{i}' for i in range(args.keys)]
+    caches = {
+        'single lock': InMemoryCache('benchmark-contention'),
+        f'{SHARDS} shards': ShardedStore(SHARDS),
+    }
+    for cache in caches.values():
+        for key in keys:
+            cache.set(key, key)
+
+    header = ''.join(f'{name:>16}' for name in caches)
+    print(f'{args.ops} operations per run, ops/s')
+    print(f'{"threads":<8}{header}')
+    for threads in (1, 2, 4, 8, 16):
+        rates = [
+            run(cache, threads, args.ops, keys) for cache in caches.values()
+        ]
+        print(f'{threads:<8}' + ''.join(f'{rate:>16.0f}' for rate in rates))
+
+
+if __name__ == '__main__':
+    main()
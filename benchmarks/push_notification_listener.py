@@ -0,0 +1,77 @@
+"""Push-notification listener throughput, in notifications per second.
+
+Sends pre-signed notifications through the CLI listener's ASGI handler
+(in process, no sockets), so the figure covers routing, JWT and digest
+verification, replay checking and body parsing.
+
+    python -m benchmarks.push_notification_listener --count 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.push_notification_signing import sample_notification
+from common.utils.push_notification_auth import (
+    SIGNING_KEY_PARAMS,
+    PushNotificationReceiverAuth,
+    PushNotificationSenderAuth,
+)
+from hosts.cli.push_notification_listener import PushNotificationListener
+
+
+async def run(algorithm: str, count: int) -> float:
+    sender = PushNotificationSenderAuth()
+    sender.generate_jwk(algorithm)
+    receiver_auth = PushNotificationReceiverAuth()
+    received = 0
+
+    def on_notification(_notification):
+        nonlocal received
+        received += 1
+
+    listener = PushNotificationListener(
+        '127.0.0.1', 0, receiver_auth, on_notification=on_notification
+    )
+    app = listener.app
+    app.add_route('/jwks', sender.handle_jwks_endpoint)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://listener'
+    ) as client:
+        await receiver_auth.load_jwks(
+            'http://listener/jwks', httpx_client=client
+        )
+
+        data = sample_notification()
+        requests = []
+        for i in range(count):
+            # Every token must be unique, or the replay cache rejects it.
+            body = sender._serialize_request_body({**data, 'sequence': i})
+            token = sender._generate_jwt_for_body(body)
+            requests.append((body, {'Authorization': f'Bearer {token}'}))
+
+        started = time.perf_counter()
+        for body, headers in requests:
+            response = await client.post('/notify', content=body, headers=headers)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+    assert received == count
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f'{args.count} notifications per run')
+    print(f'{"algorithm":<10}{"notifications/s":>18}')
+    for algorithm in SIGNING_KEY_PARAMS:
+        rate = asyncio.run(run(algorithm, args.count))
+        print(f'{algorithm:<10}{rate:>18.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Push-notification signing throughput, in notifications per second per core.
+
+Compares the previous send path (hash a json.dumps of the payload, then
+serialize it again for the request body) with serializing once, for each
+supported signing algorithm.
+
+    python -m benchmarks.push_notification_signing --count 2000
+"""
+
+import argparse
+import json
+import time
+
+from common.types import (
+    Artifact,
+    FileContent,
+    FilePart,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from common.utils.push_notification_auth import (
+    SIGNING_KEY_PARAMS,
+    PushNotificationSenderAuth,
+)
+
+
+def sample_notification() -> dict:
+    task = Task(
+        id='0f6a3c1e-5d8b-4a52-9b8e-1f2d3c4b5a69',
+        sessionId='b7e3d2c1a0f94e8d',
+        status=TaskStatus(state=TaskState.COMPLETED),
+        artifacts=[
+            Artifact(
+                name='video',
+                parts=[
+                    TextPart(text='A drone shot over a misty forest at dawn'),
+                    FilePart(
+                        file=FileContent(
+                            mimeType='video/mp4',
+                            uri='https://storage.googleapis.com/bucket/videos/'
+                            'sample.mp4?X-Goog-Signature=' + 'a' * 256,
+                        )
+                    ),
+                ],
+            )
+        ],
+    )
+    return task.model_dump(mode='json', exclude_none=True)
+
+
+def legacy_send(sender: PushNotificationSenderAuth, data: dict) -> bytes:
+    token = sender._generate_jwt(data)
+    # httpx serialized the payload a second time for `json=data`.
+    body = json.dumps(data).encode()
+    return token.encode() + body
+
+
+def current_send(sender: PushNotificationSenderAuth, data: dict) -> bytes:
+    body = sender._serialize_request_body(data)
+    token = sender._generate_jwt_for_body(body)
+    return token.encode() + body
+
+
+def measure(send, sender, data, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        send(sender, data)
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    data = sample_notification()
+    size = len(json.dumps(data))
+    print(f'payload: {size} bytes, {args.count} notifications per run')
+    print(f'{"algorithm":<10}{"legacy/s":>12}{"current/s":>12}{"speedup":>10}')
+    baseline = None
+    for algorithm in SIGNING_KEY_PARAMS:
+        sender = PushNotificationSenderAuth()
+        sender.generate_jwk(algorithm)
+        current_send(sender, data)  # warm up
+        legacy = measure(legacy_send, sender, data, args.count)
+        current = measure(current_send, sender, data, args.count)
+        baseline = baseline or legacy
+        print(
+            f'{algorithm:<10}{legacy:>12.0f}{current:>12.0f}'
+            f'{current / baseline:>9.1f}x'
+        )
+    print('speedup is relative to the legacy RS256 path')
+
+
+if __name__ == '__main__':
+    main()
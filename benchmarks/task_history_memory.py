@@ -0,0 +1,119 @@
+"""Memory held by InMemoryTaskManager task history.
+
+Stores the same conversations as Task models carrying their full history
+(as the task manager used to) and through InMemoryTaskManager, and reports
+the memory allocated per task.
+
+    python -m benchmarks.task_history_memory --tasks 100000 --messages 4
+"""
+
+import argparse
+import asyncio
+import gc
+import tracemalloc
+
+from collections.abc import Callable
+
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    Message,
+    Task,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+)
+
+
+class BenchmarkTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def conversation(task: int, messages: int) -> list[Message]:
+    # Validated from wire-format dicts, as the server receives them.
+    return [
+        Message.model_validate(
+            {
+                'role': 'user' if i % 2 == 0 else 'agent',
+                'parts': [
+                    {'type': 'text', 'text': f'message {i} of task {task}'}
+                ],
+            }
+        )
+        for i in range(messages)
+    ]
+
+
+def store_models(tasks: int, messages: int) -> dict[str, Task]:
+    store = {}
+    for i in range(tasks):
+        history = conversation(i, messages)
+        store[f'task-{i}'] = Task(
+            id=f'task-{i}',
+            sessionId=f'session-{i}',
+            status=TaskStatus(state=TaskState.WORKING, message=history[-1]),
+            history=history,
+        )
+    return store
+
+
+def store_task_manager(tasks: int, messages: int) -> InMemoryTaskManager:
+    manager = BenchmarkTaskManager()
+
+    async def fill():
+        for i in range(tasks):
+            history = conversation(i, messages)
+            await manager.upsert_task(
+                TaskSendParams(
+                    id=f'task-{i}', sessionId=f'session-{i}', message=history[0]
+                )
+            )
+            for message in history[1:]:
+                await manager.update_store(
+                    f'task-{i}',
+                    TaskStatus(state=TaskState.WORKING, message=message),
+                    None,
+                )
+
+    asyncio.run(fill())
+    return manager
+
+
+def measure(build: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    stored = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del stored
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100_000)
+    parser.add_argument('--messages', type=int, default=4)
+    args = parser.parse_args()
+
+    results = {
+        'Task.history models': measure(
+            lambda: store_models(args.tasks, args.messages)
+        ),
+        'InMemoryTaskManager': measure(
+            lambda: store_task_manager(args.tasks, args.messages)
+        ),
+    }
+    print(f'{args.tasks} tasks, {args.messages} messages each')
+    for name, size in results.items():
+        print(
+            f'{name:<22}{size / 2**20:>10.1f} MiB'
+            f'{size / args.tasks:>10.0f} bytes/task'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,10 @@
 import json
+import re
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import ClassVar
 
 import httpx
 
@@ -8,16 +14,90 @@ from common.types import (
 )
 
 
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass
+class _CachedCard:
+    card: AgentCard
+    etag: str | None
+    expires_at: float
+
+
 class A2ACardResolver:
-    def __init__(self, base_url, agent_card_path='/.well-known/agent.json'):
+    """Fetches agent cards, caching them per URL.
+
+    Cached cards are served without a request until the `max-age` sent by the
+    server elapses. After that the card is revalidated with `If-None-Match`,
+    so an unchanged card costs a 304 instead of a full download and parse.
+
+    The cache is shared by all resolvers, since a resolver is usually
+    created for a single lookup; `clear_cache` empties it.
+    """
+
+    _cache: ClassVar[dict[str, _CachedCard]] = {}
+    _cache_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        base_url,
+        agent_card_path='/.well-known/agent.json',
+        httpx_client: httpx.Client | None = None,
+    ):
         self.base_url = base_url.rstrip('/')
         self.agent_card_path = agent_card_path.lstrip('/')
+        self.httpx_client = httpx_client
+
+    @property
+    def card_url(self) -> str:
+        return self.base_url + '/' + self.agent_card_path
+
+    def get_agent_card(self, force_refresh: bool = False) -> AgentCard:
+        url = self.card_url
+        with self._cache_lock:
+            cached = self._cache.get(url)
+        if (
+            cached is not None
+            and not force_refresh
+            and time.monotonic() < cached.expires_at
+        ):
+            return cached.card
+
+        headers = {}
+        if cached is not None and cached.etag:
+            headers['If-None-Match'] = cached.etag
 
-    def get_agent_card(self) -> AgentCard:
-        with httpx.Client() as client:
-            response = client.get(self.base_url + '/' + self.agent_card_path)
+        if self.httpx_client is not None:
+            response = self.httpx_client.get(url, headers=headers)
+        else:
+            with httpx.Client() as client:
+                response = client.get(url, headers=headers)
+
+        expires_at = time.monotonic() + self._max_age(response)
+        if response.status_code == 304 and cached is not None:
+            card = cached.card
+            etag = response.headers.get('ETag', cached.etag)
+        else:
             response.raise_for_status()
             try:
-                return AgentCard(**response.json())
+                card = AgentCard(**response.json())
             except json.JSONDecodeError as e:
                 raise A2AClientJSONError(str(e)) from e
+            etag = response.headers.get('ETag')
+
+        with self._cache_lock:
+            self._cache[url] = _CachedCard(card, etag, expires_at)
+        return card
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @staticmethod
+    def _max_age(response: httpx.Response) -> int:
+        cache_control = response.headers.get('Cache-Control', '')
+        if 'no-store' in cache_control or 'no-cache' in cache_control:
+            return 0
+        match = _MAX_AGE_RE.search(cache_control)
+        return int(match.group(1)) if match else 0
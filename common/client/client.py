@@ -1,14 +1,17 @@
+import asyncio
 import json
+import logging
 
-from collections.abc import AsyncIterable
-from typing import Any
+from collections.abc import AsyncIterable, Iterable
+from typing import Any, Self
 
 import httpx
 
 from httpx._types import TimeoutTypes
-from httpx_sse import connect_sse
+from httpx_sse import aconnect_sse
 
 from common.types import (
+    A2AClientError,
     A2AClientHTTPError,
     A2AClientJSONError,
     AgentCard,
@@ -28,12 +31,29 @@ from common.types import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
 class A2AClient:
+    """JSON-RPC client for an A2A server.
+
+    The client owns a single pooled `httpx.AsyncClient` that is reused for all
+    requests and streams, so connections are kept alive across calls. Use it
+    as an async context manager, or call `aclose()` when done. An existing
+    `httpx.AsyncClient` can be passed in instead, in which case the caller
+    remains responsible for closing it.
+    """
+
     def __init__(
         self,
         agent_card: AgentCard = None,
         url: str = None,
         timeout: TimeoutTypes = 60.0,
+        httpx_client: httpx.AsyncClient | None = None,
+        limits: httpx.Limits | None = None,
+        http2: bool = False,
     ):
         if agent_card:
             self.url = agent_card.url
@@ -42,6 +62,29 @@ class A2AClient:
         else:
             raise ValueError('Must provide either agent_card or url')
         self.timeout = timeout
+        if httpx_client is not None:
+            self._client = httpx_client
+            self._owns_client = False
+        else:
+            # http2=True requires the optional `h2` package (httpx[http2]).
+            self._client = httpx.AsyncClient(
+                timeout=timeout,
+                limits=limits or httpx.Limits(
+                    max_connections=200, max_keepalive_connections=50
+                ),
+                http2=http2,
+            )
+            self._owns_client = True
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
 
     async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
@@ -51,31 +94,126 @@ class A2AClient:
         self, payload: dict[str, Any]
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
-                client, 'POST', self.url, json=request.model_dump()
+        try:
+            async with aconnect_sse(
+                self._client,
+                'POST',
+                self.url,
+                json=request.model_dump(),
+                timeout=None,
             ) as event_source:
-                try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(400, str(e)) from e
+                event_source.response.raise_for_status()
+                async for sse in event_source.aiter_sse():
+                    yield SendTaskStreamingResponse(**json.loads(sse.data))
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
 
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
+    async def send_tasks_streaming(
+        self,
+        payloads: Iterable[dict[str, Any]],
+        concurrency: int = 8,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ) -> AsyncIterable[
+        tuple[str, SendTaskStreamingResponse | A2AClientError]
+    ]:
+        """Streams many tasks at once, yielding `(task_id, event)` pairs.
+
+        At most `concurrency` streams are open at a time; `payloads` is
+        consumed lazily so it may be a generator over a large prompt set.
+        Events from all streams are yielded as they arrive. A stream that
+        fails with a transient HTTP error before producing any event is
+        retried with exponential backoff. A task that still fails, or fails
+        otherwise (e.g. on a malformed event), yields an `A2AClientError` in
+        place of an event instead of aborting the others.
+        """
+        payload_iter = iter(payloads)
+        events: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+        done = object()
+
+        async def worker():
+            try:
+                for payload in payload_iter:
+                    task_id = payload.get('id')
+                    try:
+                        async for event in self._stream_with_retries(
+                            payload, max_retries, retry_backoff
+                        ):
+                            await events.put((task_id, event))
+                    except A2AClientError as e:
+                        await events.put((task_id, e))
+                    except Exception as e:  # noqa: BLE001
+                        # E.g. an invalid payload or a malformed event: fail
+                        # this task only and keep the worker going.
+                        error = A2AClientError(f'Task {task_id} failed: {e!r}')
+                        error.__cause__ = e
+                        await events.put((task_id, error))
+            finally:
+                # Workers are only cancelled once the consumer has stopped
+                # draining the queue, so waiting to put the sentinel then
+                # would never return.
+                if not asyncio.current_task().cancelling():
+                    await events.put(done)
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(max(1, concurrency))
+        ]
+        try:
+            remaining = len(workers)
+            while remaining:
+                item = await events.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _stream_with_retries(
+        self, payload: dict[str, Any], max_retries: int, retry_backoff: float
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        attempt = 0
+        while True:
+            received_events = False
             try:
-                # Image generation could take time, adding timeout
-                response = await client.post(
-                    self.url, json=request.model_dump(), timeout=self.timeout
+                async for event in self.send_task_streaming(payload):
+                    received_events = True
+                    yield event
+                return
+            except A2AClientHTTPError as e:
+                # Once events were delivered the task exists server side, so
+                # resubmitting it would not be a transparent retry.
+                if (
+                    received_events
+                    or attempt >= max_retries
+                    or not _is_transient(e)
+                ):
+                    raise
+                delay = retry_backoff * 2**attempt
+                attempt += 1
+                logger.warning(
+                    f'Retrying task {payload["id"]} in {delay:.1f}s after: {e}'
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
+                await asyncio.sleep(delay)
+
+    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
+        try:
+            # Image generation could take time, adding timeout
+            response = await self._client.post(
+                self.url, json=request.model_dump(), timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
 
     async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
         request = GetTaskRequest(params=payload)
@@ -100,3 +238,12 @@ class A2AClient:
         return GetTaskPushNotificationResponse(
             **await self._send_request(request)
         )
+
+
+def _is_transient(error: A2AClientHTTPError) -> bool:
+    if error.status_code in RETRYABLE_STATUS_CODES:
+        return True
+    return isinstance(
+        error.__cause__,
+        httpx.TimeoutException | httpx.NetworkError | httpx.RemoteProtocolError,
+    )
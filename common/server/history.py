@@ -0,0 +1,79 @@
+"""Compact storage for task message history."""
+
+import sys
+
+from collections.abc import Iterable
+from typing import Any
+
+from common.types import Message, Part, TextPart
+
+
+class HistoryRecord:
+    """A stored message: interned role, parts and metadata.
+
+    Text parts without metadata, by far the most common kind, are kept as
+    plain strings; other parts keep their model.
+    """
+
+    __slots__ = ('role', 'parts', 'metadata')
+
+    def __init__(
+        self,
+        role: str,
+        parts: tuple[str | Part, ...],
+        metadata: dict[str, Any] | None,
+    ):
+        self.role = role
+        self.parts = parts
+        self.metadata = metadata
+
+    @classmethod
+    def from_message(cls, message: Message) -> 'HistoryRecord':
+        return cls(
+            sys.intern(message.role),
+            tuple(
+                part.text
+                if isinstance(part, TextPart) and part.metadata is None
+                else part
+                for part in message.parts
+            ),
+            message.metadata,
+        )
+
+    def to_message(self) -> Message:
+        # The content was validated when the message was received.
+        return Message.model_construct(
+            role=self.role,
+            parts=[
+                TextPart.model_construct(text=part)
+                if isinstance(part, str)
+                else part
+                for part in self.parts
+            ],
+            metadata=self.metadata,
+        )
+
+
+class TaskHistory:
+    """Message history of one task, materialized as models only on demand."""
+
+    __slots__ = ('_records',)
+
+    def __init__(self, messages: Iterable[Message] = ()):
+        self._records = [HistoryRecord.from_message(m) for m in messages]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def append(self, message: Message):
+        self._records.append(HistoryRecord.from_message(message))
+
+    def tail(self, length: int | None = None) -> list[Message]:
+        """Returns the last `length` messages, or all of them if None."""
+        if length is None:
+            records = self._records
+        elif length > 0:
+            records = self._records[-length:]
+        else:
+            return []
+        return [record.to_message() for record in records]
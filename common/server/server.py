@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 
@@ -8,7 +9,7 @@ from pydantic import ValidationError
 from sse_starlette.sse import EventSourceResponse
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 
 from common.server.task_manager import TaskManager
 from common.types import (
@@ -26,6 +27,7 @@ from common.types import (
     SetTaskPushNotificationRequest,
     TaskResubscriptionRequest,
 )
+from common.utils.serialization import dump_json, dump_json_rpc_response
 
 
 logger = logging.getLogger(__name__)
@@ -39,12 +41,17 @@ class A2AServer:
         endpoint='/',
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        agent_card_max_age: int = 300,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
+        self.agent_card_max_age = agent_card_max_age
+        self._agent_card_source: AgentCard | None = None
+        self._agent_card_body: bytes = b''
+        self._agent_card_headers: dict[str, str] = {}
         self.app = Starlette()
         self.app.add_route(
             self.endpoint, self._process_request, methods=['POST']
@@ -64,13 +71,45 @@ class A2AServer:
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    def _get_agent_card(self, request: Request) -> Response:
+        if self._agent_card_source is not self.agent_card:
+            self._serialize_agent_card()
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and self._etag_matches(if_none_match):
+            return Response(status_code=304, headers=self._agent_card_headers)
+
+        return Response(
+            content=self._agent_card_body,
+            media_type='application/json',
+            headers=self._agent_card_headers,
+        )
+
+    def _serialize_agent_card(self):
+        """Serializes the agent card once and derives its ETag.
+
+        The card is re-serialized only when `agent_card` is replaced.
+        """
+        body = dump_json(self.agent_card)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._agent_card_body = body
+        self._agent_card_headers = {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={self.agent_card_max_age}',
+        }
+        self._agent_card_source = self.agent_card
+
+    def _etag_matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == '*':
+            return True
+        etag = self._agent_card_headers['ETag']
+        candidates = (tag.strip() for tag in if_none_match.split(','))
+        return any(tag.removeprefix('W/') == etag for tag in candidates)
 
     async def _process_request(self, request: Request):
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
+            # Parses and validates in one pass over the raw body.
+            json_rpc_request = A2ARequest.validate_json(await request.body())
 
             if isinstance(json_rpc_request, GetTaskRequest):
                 result = await self.task_manager.on_get_task(json_rpc_request)
@@ -107,8 +146,8 @@ class A2AServer:
         except Exception as e:
             return self._handle_exception(e)
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
-        if isinstance(e, json.decoder.JSONDecodeError):
+    def _handle_exception(self, e: Exception) -> Response:
+        if isinstance(e, ValidationError) and _is_json_error(e):
             json_rpc_error = JSONParseError()
         elif isinstance(e, ValidationError):
             json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
@@ -117,21 +156,28 @@ class A2AServer:
             json_rpc_error = InternalError()
 
         response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(
-            response.model_dump(exclude_none=True), status_code=400
+        return Response(
+            dump_json(response),
+            status_code=400,
+            media_type='application/json',
         )
 
-    def _create_response(
-        self, result: Any
-    ) -> JSONResponse | EventSourceResponse:
+    def _create_response(self, result: Any) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
-            async def event_generator(result) -> AsyncIterable[dict[str, str]]:
+            async def event_generator(result) -> AsyncIterable[bytes]:
+                # Events published to a task's subscribers are frozen when
+                # published, so each is serialized once however many streams
+                # carry it.
                 async for item in result:
-                    yield {'data': item.model_dump_json(exclude_none=True)}
+                    yield b'data: %s\r\n\r\n' % dump_json_rpc_response(item)
 
             return EventSourceResponse(event_generator(result))
         if isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            return Response(dump_json(result), media_type='application/json')
         logger.error(f'Unexpected result type: {type(result)}')
         raise ValueError(f'Unexpected result type: {type(result)}')
+
+
+def _is_json_error(e: ValidationError) -> bool:
+    return any(error['type'] == 'json_invalid' for error in e.errors())
@@ -4,6 +4,7 @@ import logging
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterable
 
+from common.server.history import TaskHistory
 from common.server.utils import new_not_implemented_error
 from common.types import (
     Artifact,
@@ -16,6 +17,7 @@ from common.types import (
     InternalError,
     JSONRPCError,
     JSONRPCResponse,
+    Message,
     PushNotificationConfig,
     SendTaskRequest,
     SendTaskResponse,
@@ -35,6 +37,7 @@ from common.types import (
     TaskStatus,
     TaskStatusUpdateEvent,
 )
+from common.utils.serialization import freeze_json
 
 
 logger = logging.getLogger(__name__)
@@ -81,8 +84,17 @@ class TaskManager(ABC):
 
 
 class InMemoryTaskManager(TaskManager):
+    """Keeps tasks in memory.
+
+    Stored tasks have no `history`; their messages are kept compactly in
+    `task_histories` and turned back into models only when a task is
+    returned to a client (see `append_task_history`) or requested with
+    `get_task_history`.
+    """
+
     def __init__(self):
         self.tasks: dict[str, Task] = {}
+        self.task_histories: dict[str, TaskHistory] = {}
         self.push_notification_infos: dict[str, PushNotificationConfig] = {}
         self.lock = asyncio.Lock()
         self.task_sse_subscribers: dict[str, list[asyncio.Queue]] = {}
@@ -212,13 +224,16 @@ class InMemoryTaskManager(TaskManager):
                 task = Task(
                     id=task_send_params.id,
                     sessionId=task_send_params.sessionId,
-                    messages=[task_send_params.message],
                     status=TaskStatus(state=TaskState.SUBMITTED),
-                    history=[task_send_params.message],
                 )
                 self.tasks[task_send_params.id] = task
+                self.task_histories[task_send_params.id] = TaskHistory(
+                    [task_send_params.message]
+                )
             else:
-                task.history.append(task_send_params.message)
+                self.task_histories[task_send_params.id].append(
+                    task_send_params.message
+                )
 
             return task
 
@@ -240,7 +255,7 @@ class InMemoryTaskManager(TaskManager):
             task.status = status
 
             if status.message is not None:
-                task.history.append(status.message)
+                self.task_histories[task_id].append(status.message)
 
             if artifacts is not None:
                 if task.artifacts is None:
@@ -252,12 +267,19 @@ class InMemoryTaskManager(TaskManager):
     def append_task_history(self, task: Task, historyLength: int | None):
         new_task = task.model_copy()
         if historyLength is not None and historyLength > 0:
-            new_task.history = new_task.history[-historyLength:]
+            new_task.history = self.get_task_history(task.id, historyLength)
         else:
             new_task.history = []
 
         return new_task
 
+    def get_task_history(
+        self, task_id: str, length: int | None = None
+    ) -> list[Message]:
+        """Returns the last `length` messages of a task, or all of them."""
+        history = self.task_histories.get(task_id)
+        return [] if history is None else history.tail(length)
+
     async def setup_sse_consumer(
         self, task_id: str, is_resubscribe: bool = False
     ):
@@ -276,6 +298,10 @@ class InMemoryTaskManager(TaskManager):
             if task_id not in self.task_sse_subscribers:
                 return
 
+            # All subscribers get the same event object; the server streams
+            # it as frozen here, serialized once for all of them.
+            if not isinstance(task_update_event, JSONRPCError):
+                freeze_json(task_update_event)
             current_subscribers = self.task_sse_subscribers[task_id]
             for subscriber in current_subscribers:
                 await subscriber.put(task_update_event)
@@ -0,0 +1,289 @@
+"""SQLite-backed persistent tier for InMemoryCache."""
+
+import atexit
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+# Compact the file once this fraction of its pages is free.
+VACUUM_FREE_RATIO = 0.25
+# Once over max_bytes, drop rows down to this fraction of it, so a full
+# cache is not trimmed again on every flush.
+EVICT_TO_RATIO = 0.9
+# How long a write waits while VACUUM holds the file.
+_BUSY_TIMEOUT = 30.0
+# Keys per statement when looking up the stored size of flushed keys.
+_SIZE_QUERY_BATCH = 500
+
+_DELETE = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at);
+CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at);
+"""
+
+
+class DiskCacheTier:
+    """Persists cache entries in a local SQLite file.
+
+    Writes are buffered in memory and flushed by a background thread every
+    `flush_interval` seconds (write-behind), in one transaction per flush,
+    so a crash can lose at most the last interval of writes. Reads see
+    buffered writes first. The size of the stored values is tracked as
+    rows are written, and once it exceeds `max_bytes` the least recently
+    read rows are dropped, down to `EVICT_TO_RATIO` of it. Every
+    `compact_interval` seconds expired rows are deleted too, and the file
+    is compacted with VACUUM once enough of it is free; VACUUM runs on its
+    own connection, so reads are not blocked meanwhile. Expiry times are
+    wall-clock, so they survive restarts.
+
+    Values are pickled; values that cannot be pickled are kept in memory
+    only.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_DISK_MAX_BYTES,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000,
+        compact_interval: float = 60.0,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.compact_interval = compact_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=_BUSY_TIMEOUT,
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        # Size of the stored values, kept up to date under _db_lock.
+        self._stored_bytes = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM cache'
+        ).fetchone()[0]
+        self._compacted_at = time.monotonic()
+        # key -> (pickled value, expires_at) or _DELETE, in write order.
+        self._pending: dict[str, Any] = {}
+        self._touched: set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._write_behind, name='disk-cache-writer', daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def get(self, key: str) -> tuple[bool, Any, float | None]:
+        """Returns (found, value, expires_at) for an unexpired key."""
+        with self._pending_lock:
+            pending = self._pending.get(key)
+        if pending is _DELETE:
+            return False, None, None
+        if pending is not None:
+            blob, expires_at = pending
+        else:
+            with self._db_lock:
+                row = self._conn.execute(
+                    'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+                ).fetchone()
+            if row is None:
+                return False, None, None
+            blob, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return False, None, None
+        with self._pending_lock:
+            self._touched.add(key)
+        return True, pickle.loads(blob), expires_at
+
+    def put(self, key: str, value: Any, expires_at: float | None = None):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f'Not persisting cache key {key}: {e}')
+            return
+        self._queue(key, (blob, expires_at))
+
+    def delete(self, key: str):
+        self._queue(key, _DELETE)
+
+    def clear(self):
+        # Under the database lock, so a flush cannot write a snapshot taken
+        # before the clear after it.
+        with self._db_lock:
+            with self._pending_lock:
+                self._pending.clear()
+                self._touched.clear()
+            self._conn.execute('DELETE FROM cache')
+            self._stored_bytes = 0
+
+    def flush(self) -> bool:
+        """Writes all buffered changes now; returns False if there were none."""
+        with self._db_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                touched, self._touched = self._touched, set()
+            if not pending and not touched:
+                return False
+            now = time.time()
+            writes = [
+                (key, blob, len(blob), expires_at, now)
+                for key, item in pending.items()
+                if item is not _DELETE
+                for blob, expires_at in (item,)
+            ]
+            deletes = [
+                (key,) for key, item in pending.items() if item is _DELETE
+            ]
+            self._conn.execute('BEGIN')
+            try:
+                replaced = self._size_of(list(pending))
+                self._conn.executemany(
+                    'DELETE FROM cache WHERE key = ?', deletes
+                )
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO cache '
+                    '(key, value, size, expires_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    writes,
+                )
+                self._conn.executemany(
+                    'UPDATE cache SET accessed_at = ? WHERE key = ?',
+                    [(now, key) for key in touched],
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._stored_bytes += sum(write[2] for write in writes) - replaced
+        return bool(pending)
+
+    def compact(self):
+        """Drops expired and excess rows and reclaims free file space."""
+        with self._db_lock:
+            self._compacted_at = time.monotonic()
+            conn = self._conn
+            now = time.time()
+            conn.execute('BEGIN')
+            try:
+                expired = conn.execute(
+                    'SELECT COALESCE(SUM(size), 0) FROM cache '
+                    'WHERE expires_at <= ?',
+                    (now,),
+                ).fetchone()[0]
+                conn.execute('DELETE FROM cache WHERE expires_at <= ?', (now,))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            self._stored_bytes -= expired
+            self._evict()
+        self._vacuum()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+        atexit.unregister(self.close)
+
+    def _size_of(self, keys: list[str]) -> int:
+        """Returns the stored size of those of `keys` that are stored."""
+        total = 0
+        for start in range(0, len(keys), _SIZE_QUERY_BATCH):
+            batch = keys[start : start + _SIZE_QUERY_BATCH]
+            total += self._conn.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM cache WHERE key IN '
+                f'({",".join("?" * len(batch))})',
+                batch,
+            ).fetchone()[0]
+        return total
+
+    def _evict(self):
+        # Called with _db_lock held. Keeps the most recently read rows that
+        # fit and drops the rest.
+        if self._stored_bytes <= self.max_bytes:
+            return
+        conn = self._conn
+        conn.execute(
+            'DELETE FROM cache WHERE key IN ('
+            ' SELECT key FROM ('
+            '  SELECT key, SUM(size) OVER'
+            '   (ORDER BY accessed_at DESC, key) AS running'
+            '  FROM cache'
+            ' ) WHERE running > ?'
+            ')',
+            (int(self.max_bytes * EVICT_TO_RATIO),),
+        )
+        self._stored_bytes = conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM cache'
+        ).fetchone()[0]
+
+    def _vacuum(self):
+        # On a connection of its own, so reads through the shared connection
+        # go on meanwhile; in WAL mode they see the file as it was before.
+        conn = sqlite3.connect(
+            self.path, isolation_level=None, timeout=_BUSY_TIMEOUT
+        )
+        try:
+            pages = conn.execute('PRAGMA page_count').fetchone()[0]
+            free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if pages and free / pages >= VACUUM_FREE_RATIO:
+                conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+    def _queue(self, key: str, item: Any):
+        with self._pending_lock:
+            self._pending.pop(key, None)
+            self._pending[key] = item
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def _write_behind(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                if self.flush():
+                    if (
+                        time.monotonic() - self._compacted_at
+                        >= self.compact_interval
+                    ):
+                        self.compact()
+                    else:
+                        with self._db_lock:
+                            self._evict()
+            except Exception as e:
+                logger.warning(f'Flushing disk cache {self.path} failed: {e}')
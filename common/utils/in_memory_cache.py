@@ -1,50 +1,328 @@
 """In Memory Cache utility."""
 
+import asyncio
+import heapq
+import inspect
+import logging
+import math
+import random
+import sys
 import threading
 import time
 
-from typing import Any, Optional
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, ClassVar
+
+from common.utils.disk_cache import DEFAULT_DISK_MAX_BYTES, DiskCacheTier
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_NAME = 'default'
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Expired entries reclaimed per lock acquisition by the expiry thread.
+EXPIRY_BATCH_SIZE = 256
+# Longest the expiry thread sleeps, so it notices a cleared heap.
+MAX_EXPIRY_INTERVAL = 60.0
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+    disk_hits: int = 0
+
+
+class _CacheEntry:
+    # fresh_until is when the value should be recomputed; it may be served
+    # stale until expires_at. delta is how long computing the value took.
+    __slots__ = ('value', 'size', 'expires_at', 'fresh_until', 'delta')
+
+    def __init__(
+        self,
+        value: Any,
+        size: int,
+        expires_at: float | None,
+        fresh_until: float | None = None,
+        delta: float = 0.0,
+    ):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.fresh_until = fresh_until
+        self.delta = delta
+
+
+class _CacheStore:
+    """The entries of a cache, with their lock, LRU order and expiry heap."""
+
+    def __init__(self, max_entries: int | None, max_bytes: int | None):
+        # Ordered from least to most recently used.
+        self._cache_data: OrderedDict[str, _CacheEntry] = OrderedDict()
+        # (expires_at, key); entries replaced or removed since are skipped
+        # when their deadline is popped.
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._bytes = 0
+        self._stats = CacheStats()
+        # Keys whose value is being computed by get_or_set.
+        self._inflight: dict[str, Future] = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data_lock: threading.Lock = threading.Lock()
+
+    def configure(self, max_entries: int | None, max_bytes: int | None):
+        with self._data_lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        ttl: float | None,
+        stale_ttl: float = 0.0,
+        delta: float = 0.0,
+    ) -> bool:
+        """Stores an entry; returns True if it became the earliest deadline."""
+        with self._data_lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Storing it would evict everything else and still not fit.
+                self._stats.evictions += 1
+                return False
+
+            fresh_until = expires_at = None
+            if ttl is not None:
+                fresh_until = time.monotonic() + ttl
+                expires_at = fresh_until + stale_ttl
+            self._cache_data[key] = _CacheEntry(
+                value, size, expires_at, fresh_until, delta
+            )
+            self._bytes += size
+            self._evict()
+            if expires_at is None:
+                return False
+            return self._schedule_expiry(key, expires_at)
+
+    def get(self, key: str, default: Any) -> Any:
+        entry = self.lookup(key)
+        return default if entry is None else entry.value
+
+    def lookup(self, key: str) -> _CacheEntry | None:
+        """Returns the unexpired entry for a key, counting a hit or miss."""
+        with self._data_lock:
+            entry = self._cache_data.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            expires_at = entry.expires_at
+            if expires_at is not None and time.monotonic() > expires_at:
+                self._remove(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._cache_data.move_to_end(key)
+            self._stats.hits += 1
+            return entry
+
+    def begin_compute(self, key: str) -> tuple[Future, bool]:
+        """Returns the future for computing a key, and whether it is new.
+
+        The caller that gets a new future must compute the value and call
+        `end_compute`; everyone else waits for the same future.
+        """
+        with self._data_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def end_compute(self, key: str, future: Future):
+        with self._data_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def delete(self, key: str) -> bool:
+        with self._data_lock:
+            return self._remove(key)
+
+    def clear(self):
+        with self._data_lock:
+            self._cache_data.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._data_lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                entries=len(self._cache_data),
+                bytes=self._bytes,
+                disk_hits=self._stats.disk_hits,
+            )
+
+    def record_disk_hit(self):
+        with self._data_lock:
+            self._stats.disk_hits += 1
+
+    def expire_batch(self) -> float | None:
+        """Removes up to EXPIRY_BATCH_SIZE expired entries.
+
+        Returns the next deadline, or None if the batch limit was reached.
+        """
+        with self._data_lock:
+            now = time.monotonic()
+            heap = self._expiry_heap
+            for _ in range(EXPIRY_BATCH_SIZE):
+                if not heap:
+                    return now + MAX_EXPIRY_INTERVAL
+                expires_at, key = heap[0]
+                if expires_at > now:
+                    return expires_at
+                heapq.heappop(heap)
+                entry = self._cache_data.get(key)
+                if entry is not None and entry.expires_at == expires_at:
+                    self._remove(key)
+                    self._stats.expirations += 1
+            return None
+
+    def _remove(self, key: str) -> bool:
+        entry = self._cache_data.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.size
+        return True
+
+    def _over_capacity(self) -> bool:
+        entries, max_entries = len(self._cache_data), self.max_entries
+        if max_entries is not None and entries > max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def _evict(self):
+        while self._cache_data and self._over_capacity():
+            # The first key is the least recently used one.
+            self._remove(next(iter(self._cache_data)))
+            self._stats.evictions += 1
+
+    def _schedule_expiry(self, key: str, expires_at: float) -> bool:
+        earliest = self._expiry_heap[0][0] if self._expiry_heap else None
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        stale_limit = 2 * len(self._cache_data) + EXPIRY_BATCH_SIZE
+        if len(self._expiry_heap) > stale_limit:
+            # Mostly deadlines of replaced or evicted entries; drop them.
+            self._expiry_heap = [
+                (entry.expires_at, k)
+                for k, entry in self._cache_data.items()
+                if entry.expires_at is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+        return earliest is None or expires_at < earliest
 
 
 class InMemoryCache:
-    """A thread-safe Singleton class to manage cache data.
+    """A thread-safe, named cache shared across the application.
 
-    Ensures only one instance of the cache exists across the application.
+    `InMemoryCache()` returns the process-wide 'default' cache and
+    `InMemoryCache('agent-cards')` a separate cache of that name; creating a
+    name again returns the existing instance, and the sizing arguments only
+    apply to its first creation (use `configure` afterwards).
+
+    The cache is limited by entry count and approximate size in bytes; when
+    either limit is exceeded the least recently used entries are evicted,
+    and a value larger than `max_bytes` on its own is not stored. Sizes are
+    estimated with `sys.getsizeof` of the key and value, so nested
+    containers are only counted shallowly.
+
+    Entries with a TTL are also removed when they expire, read or not: a
+    daemon thread per cache, started with the first TTL, reclaims expired
+    entries in batches of EXPIRY_BATCH_SIZE per lock acquisition.
+    Deadlines use `time.monotonic`.
+
+    With `disk_path`, a `DiskCacheTier` persists entries to a SQLite file
+    behind the memory tier: writes are flushed to it in the background,
+    memory misses are looked up there and promoted, and the file survives
+    restarts. Entries evicted from memory stay on disk until its own size
+    limit or their TTL removes them.
     """
 
-    _instance: Optional['InMemoryCache'] = None
+    _instances: ClassVar[dict[str, 'InMemoryCache']] = {}
     _lock: threading.Lock = threading.Lock()
     _initialized: bool = False
 
-    def __new__(cls):
-        """Override __new__ to control instance creation (Singleton pattern).
+    def __new__(cls, name: str = DEFAULT_CACHE_NAME, *args, **kwargs):
+        """Returns the cache with this name, creating it on first use.
 
         Uses a lock to ensure thread safety during the first instantiation.
-
-        Returns:
-            The singleton instance of InMemoryCache.
         """
-        if cls._instance is None:
+        instance = cls._instances.get(name)
+        if instance is None:
             with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
+                instance = cls._instances.get(name)
+                if instance is None:
+                    instance = super().__new__(cls)
+                    cls._instances[name] = instance
+        return instance
 
-    def __init__(self):
+    def __init__(
+        self,
+        name: str = DEFAULT_CACHE_NAME,
+        max_entries: int | None = DEFAULT_MAX_ENTRIES,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+        disk_path: str | None = None,
+        disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES,
+    ):
         """Initialize the cache storage.
 
-        Uses a flag (_initialized) to ensure this logic runs only on the very first
-        creation of the singleton instance.
+        Uses a flag (_initialized) to ensure this logic runs only on the very
+        first creation of each named instance.
+
+        Args:
+            name: Name of the cache instance.
+            max_entries: Maximum number of entries, or None for no limit.
+            max_bytes: Maximum approximate size in bytes, or None for no limit.
+            disk_path: SQLite file for a persistent second tier, if any.
+            disk_max_bytes: Maximum size of the values stored on disk.
         """
         if not self._initialized:
             with self._lock:
                 if not self._initialized:
-                    # print("Initializing SessionCache storage")
-                    self._cache_data: dict[str, dict[str, Any]] = {}
-                    self._ttl: dict[str, float] = {}
-                    self._data_lock: threading.Lock = threading.Lock()
+                    self.name = name
+                    self._data = _CacheStore(max_entries, max_bytes)
+                    self._expiry_wakeup = threading.Event()
+                    self._expiry_thread: threading.Thread | None = None
+                    self._disk = (
+                        DiskCacheTier(disk_path, max_bytes=disk_max_bytes)
+                        if disk_path
+                        else None
+                    )
                     self._initialized = True
 
+    def configure(
+        self,
+        max_entries: int | None = DEFAULT_MAX_ENTRIES,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Change the capacity limits, evicting entries if necessary."""
+        self._data.configure(max_entries, max_bytes)
+
     def set(self, key: str, value: Any, ttl: int | None = None) -> None:
         """Set a key-value pair.
 
@@ -53,13 +331,7 @@ class InMemoryCache:
             value: The data to store.
             ttl: Time to live in seconds. If None, data will not expire.
         """
-        with self._data_lock:
-            self._cache_data[key] = value
-
-            if ttl is not None:
-                self._ttl[key] = time.time() + ttl
-            elif key in self._ttl:
-                del self._ttl[key]
+        self._store(key, value, ttl)
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get the value associated with a key.
@@ -71,12 +343,85 @@ class InMemoryCache:
         Returns:
             The cached value, or the default value if not found.
         """
-        with self._data_lock:
-            if key in self._ttl and time.time() > self._ttl[key]:
-                del self._cache_data[key]
-                del self._ttl[key]
-                return default
-            return self._cache_data.get(key, default)
+        entry = self._lookup(key)
+        return default if entry is None else entry.value
+
+    def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: float | None = None,
+        stale_ttl: float = 0.0,
+        beta: float = 1.0,
+    ) -> Any:
+        """Returns the cached value, computing and storing it on a miss.
+
+        Concurrent misses for the same key, from any thread or event loop,
+        share a single call to `compute`. A value is fresh for `ttl` seconds
+        and may then be served stale for `stale_ttl` more seconds while it is
+        recomputed on a background thread. Fresh values are also refreshed
+        early with a probability that rises towards the end of their TTL and
+        with the time `compute` took (XFetch); `beta` > 1 refreshes earlier,
+        0 disables it.
+
+        Must not be called from an event loop thread while the same key is
+        being computed by `aget_or_set` on that loop.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            if self._should_refresh(entry, beta):
+                future, owner = self._data.begin_compute(key)
+                if owner:
+                    _refresh_executor().submit(
+                        self._compute, key, future, compute, ttl, stale_ttl
+                    ).add_done_callback(_log_refresh_failure(key))
+            return entry.value
+
+        future, owner = self._data.begin_compute(key)
+        if owner:
+            self._compute(key, future, compute, ttl, stale_ttl)
+        return future.result()
+
+    async def aget_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: float | None = None,
+        stale_ttl: float = 0.0,
+        beta: float = 1.0,
+    ) -> Any:
+        """Async `get_or_set`; `compute` may be a coroutine function.
+
+        Misses wait without blocking the event loop, and values are computed
+        and refreshed in tasks on the current loop; cancelling one caller
+        does not cancel a computation others are waiting for.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            if self._should_refresh(entry, beta):
+                future, owner = self._data.begin_compute(key)
+                if owner:
+                    task = asyncio.create_task(
+                        self._acompute(key, future, compute, ttl, stale_ttl)
+                    )
+                    _refresh_tasks.add(task)
+                    task.add_done_callback(_refresh_tasks.discard)
+                    task.add_done_callback(_log_refresh_failure(key))
+            return entry.value
+
+        future, owner = self._data.begin_compute(key)
+        if owner:
+            # Computed in its own task so that cancelling the caller that
+            # started it, e.g. on a client disconnect, does not fail the
+            # callers waiting for the same key.
+            task = asyncio.create_task(
+                self._acompute(key, future, compute, ttl, stale_ttl)
+            )
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+            task.add_done_callback(_consume_exception)
+        # Shielded, as cancelling the wrapper would cancel the shared future.
+        return await asyncio.shield(asyncio.wrap_future(future))
 
     def delete(self, key: str) -> None:
         """Delete a specific key-value pair from a cache.
@@ -87,13 +432,9 @@ class InMemoryCache:
         Returns:
             True if the key was found and deleted, False otherwise.
         """
-        with self._data_lock:
-            if key in self._cache_data:
-                del self._cache_data[key]
-                if key in self._ttl:
-                    del self._ttl[key]
-                return True
-            return False
+        if self._disk is not None:
+            self._disk.delete(key)
+        return self._data.delete(key)
 
     def clear(self) -> bool:
         """Remove all data.
@@ -101,8 +442,135 @@ class InMemoryCache:
         Returns:
             True if the data was cleared, False otherwise.
         """
-        with self._data_lock:
-            self._cache_data.clear()
-            self._ttl.clear()
-            return True
-        return False
+        self._data.clear()
+        if self._disk is not None:
+            self._disk.clear()
+        return True
+
+    def stats(self) -> CacheStats:
+        """Returns a snapshot of the cache counters and current size."""
+        return self._data.stats()
+
+    def flush(self) -> None:
+        """Writes pending changes to the disk tier, if there is one."""
+        if self._disk is not None:
+            self._disk.flush()
+
+    def _lookup(self, key: str) -> _CacheEntry | None:
+        entry = self._data.lookup(key)
+        if entry is not None or self._disk is None:
+            return entry
+        found, value, expires_at = self._disk.get(key)
+        if not found:
+            return None
+        self._data.record_disk_hit()
+        ttl = None if expires_at is None else expires_at - time.time()
+        self._store(key, value, ttl, persist=False)
+        return self._data.lookup(key)
+
+    def _compute(self, key, future, compute, ttl, stale_ttl):
+        started = time.monotonic()
+        try:
+            value = compute()
+        except BaseException as e:
+            self._data.end_compute(key, future)
+            future.set_exception(e)
+            raise
+        self._store(key, value, ttl, stale_ttl, time.monotonic() - started)
+        self._data.end_compute(key, future)
+        future.set_result(value)
+
+    async def _acompute(self, key, future, compute, ttl, stale_ttl):
+        started = time.monotonic()
+        try:
+            value = compute()
+            if inspect.isawaitable(value):
+                value = await value
+        except BaseException as e:
+            self._data.end_compute(key, future)
+            future.set_exception(e)
+            raise
+        self._store(key, value, ttl, stale_ttl, time.monotonic() - started)
+        self._data.end_compute(key, future)
+        future.set_result(value)
+
+    def _store(self, key, value, ttl, stale_ttl=0.0, delta=0.0, persist=True):
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if self._data.set(key, value, size, ttl, stale_ttl, delta):
+            self._wake_expiry_thread()
+        if persist and self._disk is not None:
+            # Disk expiry is wall-clock so it remains valid after a restart.
+            expires_at = None if ttl is None else time.time() + ttl + stale_ttl
+            self._disk.put(key, value, expires_at)
+
+    @staticmethod
+    def _should_refresh(entry: _CacheEntry, beta: float) -> bool:
+        if entry.fresh_until is None:
+            return False
+        now = time.monotonic()
+        if now >= entry.fresh_until:
+            return True  # Stale: serve it once more while refreshing.
+        if beta <= 0 or entry.delta <= 0:
+            return False
+        # XFetch: -log(U) is exponentially distributed, so refreshes start
+        # about delta * beta before the deadline and become certain at it.
+        return now - entry.delta * beta * math.log(1.0 - random.random()) >= (
+            entry.fresh_until
+        )
+
+    def _wake_expiry_thread(self) -> None:
+        if self._expiry_thread is None:
+            with self._lock:
+                if self._expiry_thread is None:
+                    self._expiry_thread = threading.Thread(
+                        target=self._expire_forever,
+                        name=f'in-memory-cache-expiry-{self.name}',
+                        daemon=True,
+                    )
+                    self._expiry_thread.start()
+                    return
+        self._expiry_wakeup.set()
+
+    def _expire_forever(self) -> None:
+        while True:
+            deadline = self._data.expire_batch()
+            if deadline is None:
+                continue  # A full batch was reclaimed; there may be more.
+            timeout = deadline - time.monotonic()
+            if timeout > 0:
+                self._expiry_wakeup.wait(timeout)
+                self._expiry_wakeup.clear()
+
+
+_refresh_executor_lock = threading.Lock()
+_refresh_executor_instance: ThreadPoolExecutor | None = None
+# Keeps background compute tasks referenced until they finish.
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+def _refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor_instance
+    if _refresh_executor_instance is None:
+        with _refresh_executor_lock:
+            if _refresh_executor_instance is None:
+                _refresh_executor_instance = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix='cache-refresh'
+                )
+    return _refresh_executor_instance
+
+
+def _consume_exception(task: asyncio.Task):
+    # Callers receive the exception through the shared future.
+    if not task.cancelled():
+        task.exception()
+
+
+def _log_refresh_failure(key: str):
+    def callback(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(
+                f'Background refresh of cache key {key} failed: '
+                f'{future.exception()}'
+            )
+
+    return callback
@@ -0,0 +1,152 @@
+"""Async, kid-indexed cache of a remote JSON Web Key Set."""
+
+import asyncio
+import logging
+import time
+
+import httpx
+import jwt
+
+from jwt import PyJWK, PyJWKClientError
+
+from common.utils.push_notification_delivery import get_shared_client
+
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    """Caches the signing keys published at a JWKS URL, indexed by kid.
+
+    Keys are fetched with the shared async client, so lookups never block the
+    event loop. Known keys are served from memory; once the key set is older
+    than `refresh_interval` it is re-fetched in the background while the
+    cached keys keep being served. An unknown kid triggers a re-fetch (to
+    pick up a rotated key), delayed until `min_refresh_interval` seconds have
+    passed since the previous one; a kid that is still missing from a key
+    set fetched after it was requested is negatively cached for
+    `negative_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        httpx_client: httpx.AsyncClient | None = None,
+        refresh_interval: float = 300,
+        min_refresh_interval: float = 10,
+        negative_ttl: float = 60,
+    ):
+        self.jwks_url = jwks_url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.negative_ttl = negative_ttl
+        self._httpx_client = httpx_client
+        self._keys: dict[str, PyJWK] = {}
+        self._missing: dict[str, float] = {}
+        self._fetched_at: float | None = None
+        # When the key set was last fetched successfully.
+        self._loaded_at: float | None = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def get_signing_key_from_jwt(self, token: str) -> PyJWK:
+        kid = jwt.get_unverified_header(token).get('kid')
+        if not kid:
+            raise PyJWKClientError('Token does not have a kid header')
+        return await self.get_signing_key(kid)
+
+    async def get_signing_key(self, kid: str) -> PyJWK:
+        key = self._keys.get(kid)
+        if key is not None:
+            if self._is_stale():
+                self._refresh_in_background()
+            return key
+
+        requested_at = time.monotonic()
+        if self._missing.get(kid, 0) > requested_at:
+            raise PyJWKClientError(f'No signing key found for kid {kid}')
+        if self._fetched_at is not None:
+            # Rate limited: wait for the next allowed fetch rather than
+            # rejecting a key the sender may have just rotated in.
+            delay = self._fetched_at + self.min_refresh_interval - requested_at
+            if delay > 0:
+                await asyncio.sleep(delay)
+                key = self._keys.get(kid)
+                if key is not None:
+                    return key
+        await self.refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            loaded_at = self._loaded_at
+            if loaded_at is not None and loaded_at >= requested_at:
+                self._missing[kid] = time.monotonic() + self.negative_ttl
+            raise PyJWKClientError(f'No signing key found for kid {kid}')
+        return key
+
+    async def refresh(self):
+        """Fetches the key set; concurrent callers share a single request."""
+        requested_at = time.monotonic()
+        async with self._refresh_lock:
+            fetched_at = self._fetched_at
+            if fetched_at is not None and fetched_at >= requested_at:
+                # Another caller refreshed while this one waited for the lock.
+                return
+            client = self._httpx_client or get_shared_client()
+            try:
+                response = await client.get(self.jwks_url)
+                response.raise_for_status()
+                jwk_set = response.json()
+            except Exception as e:
+                if not self._keys:
+                    raise PyJWKClientError(
+                        f'Failed to fetch JWKS from {self.jwks_url}: {e}'
+                    ) from e
+                # Keep serving the keys we have rather than failing requests.
+                logger.warning(
+                    f'Failed to refresh JWKS from {self.jwks_url}: {e}'
+                )
+                return
+            finally:
+                self._fetched_at = time.monotonic()
+
+            keys = {}
+            for key_data in jwk_set.get('keys', []):
+                try:
+                    key = PyJWK(key_data)
+                except jwt.PyJWTError as e:
+                    logger.warning(
+                        f'Skipping unusable JWK {key_data.get("kid")}: {e}'
+                    )
+                    continue
+                if key.key_id:
+                    keys[key.key_id] = key
+            self._keys = keys
+            self._loaded_at = self._fetched_at
+            self._missing = {
+                kid: expires
+                for kid, expires in self._missing.items()
+                if kid not in keys and expires > self._fetched_at
+            }
+
+    async def aclose(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+    def _is_stale(self) -> bool:
+        return (
+            self._fetched_at is None
+            or time.monotonic() - self._fetched_at >= self.refresh_interval
+        )
+
+    def _refresh_in_background(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f'Background JWKS refresh failed: {e}')
@@ -1,3 +1,4 @@
+import asyncio
 import hashlib
 import json
 import logging
@@ -10,70 +11,180 @@ import httpx
 import jwt
 
 from jwcrypto import jwk
-from jwt import PyJWK, PyJWKClient
+from jwt import PyJWK
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from common.utils.in_memory_cache import InMemoryCache
+from common.utils.jwks_cache import JWKSCache
+from common.utils.push_notification_delivery import (
+    NotificationPayload,
+    PushNotificationDelivery,
+    get_shared_client,
+)
+
 
 logger = logging.getLogger(__name__)
 AUTH_HEADER_PREFIX = 'Bearer '
+# Key parameters for each supported signing algorithm. ES256 and EdDSA sign
+# far faster than RS256 at a comparable security level.
+SIGNING_KEY_PARAMS = {
+    'RS256': {'kty': 'RSA', 'size': 2048},
+    'ES256': {'kty': 'EC', 'crv': 'P-256'},
+    'EdDSA': {'kty': 'OKP', 'crv': 'Ed25519'},
+}
+# How long a rotated-out public key stays in the JWKS, so notifications
+# signed with it just before the rotation can still be verified.
+KEY_ROTATION_OVERLAP_SECONDS = 15 * 60
+# How long a successfully verified notification URL is trusted.
+VERIFIED_URL_TTL_SECONDS = 60 * 60
+# Notifications whose token is older than this are rejected; tokens seen
+# within the window are remembered to reject replays.
+MAX_TOKEN_AGE_SECONDS = 5 * 60
+MAX_CLOCK_SKEW_SECONDS = 60
+# Set on batched notifications to the number of events in the JSON array body.
+BATCH_HEADER = 'X-A2A-Notification-Batch'
 
 
 class PushNotificationAuth:
-    def _calculate_request_body_sha256(self, data: dict[str, Any]):
-        """Calculates the SHA256 hash of a request body.
+    def _serialize_request_body(self, data: Any) -> bytes:
+        """Serializes a request body to the bytes that are signed and sent.
 
         This logic needs to be same for both the agent who signs the payload and the client verifier.
         """
-        body_str = json.dumps(
+        return json.dumps(
             data,
             ensure_ascii=False,
             allow_nan=False,
             indent=None,
             separators=(',', ':'),
-        )
-        return hashlib.sha256(body_str.encode()).hexdigest()
+        ).encode()
+
+    def _calculate_request_body_sha256(self, data: Any):
+        """Calculates the SHA256 hash of a request body."""
+        return hashlib.sha256(self._serialize_request_body(data)).hexdigest()
 
 
 class PushNotificationSenderAuth(PushNotificationAuth):
-    def __init__(self):
+    """Signs and sends push notifications.
+
+    Requests go through one pooled `httpx.AsyncClient`, by default shared by
+    all senders on the event loop. `send_push_notification` sends inline;
+    `enqueue_push_notification` hands the notification to `self.delivery`,
+    which retries failures in the background.
+
+    With `batch_window` set, queued notifications for the same URL are held
+    for up to that many seconds (or `max_batch_size` events) and sent as one
+    request whose body is a JSON array, signed with a single JWT over the
+    whole batch. A notification that has no company within the window is
+    sent on its own, unchanged.
+    """
+
+    def __init__(
+        self,
+        httpx_client: httpx.AsyncClient | None = None,
+        batch_window: float | None = None,
+        max_batch_size: int = 100,
+        **delivery_options: Any,
+    ):
         self.public_keys = []
         self.private_key_jwk: PyJWK = None
+        self._key_expiry: dict[str, float] = {}
+        self._httpx_client = httpx_client
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._batches: dict[str, list[dict[str, Any]]] = {}
+        self._batch_timers: dict[str, asyncio.Task] = {}
+        # Timers whose window has passed and that are submitting their batch.
+        self._batch_flushes: set[asyncio.Task] = set()
+        self.delivery = PushNotificationDelivery(
+            self.deliver, **delivery_options
+        )
+
+    @property
+    def httpx_client(self) -> httpx.AsyncClient:
+        return self._httpx_client or get_shared_client()
 
     @staticmethod
     async def verify_push_notification_url(url: str) -> bool:
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                validation_token = str(uuid.uuid4())
-                response = await client.get(
-                    url, params={'validationToken': validation_token}
-                )
-                response.raise_for_status()
-                is_verified = response.text == validation_token
-
-                logger.info(
-                    f'Verified push-notification URL: {url} => {is_verified}'
-                )
-                return is_verified
-            except Exception as e:
-                logger.warning(
-                    f'Error during sending push-notification for URL {url}: {e}'
-                )
+        """Checks that the URL echoes a validation token.
+
+        Successful verifications are cached for VERIFIED_URL_TTL_SECONDS.
+        """
+        cache_key = f'push_notification_url_verified:{url}'
+        cache = InMemoryCache()
+        if cache.get(cache_key):
+            return True
+        try:
+            validation_token = str(uuid.uuid4())
+            response = await get_shared_client().get(
+                url, params={'validationToken': validation_token}
+            )
+            response.raise_for_status()
+            is_verified = response.text == validation_token
+
+            logger.info(
+                f'Verified push-notification URL: {url} => {is_verified}'
+            )
+            if is_verified:
+                cache.set(cache_key, True, ttl=VERIFIED_URL_TTL_SECONDS)
+            return is_verified
+        except Exception as e:
+            logger.warning(
+                f'Error during sending push-notification for URL {url}: {e}'
+            )
 
         return False
 
-    def generate_jwk(self):
+    def generate_jwk(
+        self,
+        algorithm: str = 'RS256',
+        overlap_seconds: float = KEY_ROTATION_OVERLAP_SECONDS,
+    ):
+        """Generates a signing key for RS256, ES256 or EdDSA (Ed25519).
+
+        Calling it again rotates the key: new notifications are signed with
+        the new key, while the previous public key is still published for
+        `overlap_seconds` so in-flight notifications remain verifiable.
+        """
+        if algorithm not in SIGNING_KEY_PARAMS:
+            raise ValueError(f'Unsupported signing algorithm: {algorithm}')
         key = jwk.JWK.generate(
-            kty='RSA', size=2048, kid=str(uuid.uuid4()), use='sig'
+            **SIGNING_KEY_PARAMS[algorithm],
+            kid=str(uuid.uuid4()),
+            use='sig',
+            alg=algorithm,
         )
+        if self.private_key_jwk is not None:
+            self._key_expiry[self.private_key_jwk.key_id] = (
+                time.time() + overlap_seconds
+            )
+        self._prune_public_keys()
         self.public_keys.append(key.export_public(as_dict=True))
-        self.private_key_jwk = PyJWK.from_json(key.export_private())
+        self.private_key_jwk = PyJWK.from_json(
+            key.export_private(), algorithm=algorithm
+        )
 
     def handle_jwks_endpoint(self, _request: Request):
         """Allow clients to fetch public keys."""
+        self._prune_public_keys()
         return JSONResponse({'keys': self.public_keys})
 
-    def _generate_jwt(self, data: dict[str, Any]):
+    def _prune_public_keys(self):
+        now = time.time()
+        self.public_keys = [
+            key
+            for key in self.public_keys
+            if self._key_expiry.get(key['kid'], now + 1) > now
+        ]
+        self._key_expiry = {
+            kid: expiry for kid, expiry in self._key_expiry.items() if expiry > now
+        }
+
+    def _generate_jwt(self, data: Any):
+        return self._generate_jwt_for_body(self._serialize_request_body(data))
+
+    def _generate_jwt_for_body(self, body: bytes):
         """JWT is generated by signing both the request payload SHA digest and time of token generation.
 
         Payload is signed with private key and it ensures the integrity of payload for client.
@@ -84,36 +195,175 @@ class PushNotificationSenderAuth(PushNotificationAuth):
         return jwt.encode(
             {
                 'iat': iat,
-                'request_body_sha256': self._calculate_request_body_sha256(
-                    data
-                ),
+                'request_body_sha256': hashlib.sha256(body).hexdigest(),
             },
             key=self.private_key_jwk,
             headers={'kid': self.private_key_jwk.key_id},
-            algorithm='RS256',
+            algorithm=self.private_key_jwk.algorithm_name,
         )
 
+    async def deliver(self, url: str, data: NotificationPayload):
+        """Signs and sends a notification or batch; raises if not accepted."""
+        # The body is serialized once; the same bytes are hashed and sent.
+        body = self._serialize_request_body(data)
+        headers = {
+            'Authorization': f'Bearer {self._generate_jwt_for_body(body)}',
+            'Content-Type': 'application/json',
+        }
+        if isinstance(data, list):
+            headers[BATCH_HEADER] = str(len(data))
+        response = await self.httpx_client.post(
+            url, content=body, headers=headers
+        )
+        response.raise_for_status()
+
     async def send_push_notification(self, url: str, data: dict[str, Any]):
-        jwt_token = self._generate_jwt(data)
-        headers = {'Authorization': f'Bearer {jwt_token}'}
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                response = await client.post(url, json=data, headers=headers)
-                response.raise_for_status()
-                logger.info(f'Push-notification sent for URL: {url}')
-            except Exception as e:
-                logger.warning(
-                    f'Error during sending push-notification for URL {url}: {e}'
-                )
+        try:
+            await self.deliver(url, data)
+            logger.info(f'Push-notification sent for URL: {url}')
+        except Exception as e:
+            logger.warning(
+                f'Error during sending push-notification for URL {url}: {e}'
+            )
+
+    async def enqueue_push_notification(self, url: str, data: dict[str, Any]):
+        """Queues a notification for background delivery with retries."""
+        if not self.batch_window:
+            await self.delivery.submit(url, data)
+            return
+        batch = self._batches.setdefault(url, [])
+        batch.append(data)
+        if len(batch) >= self.max_batch_size:
+            timer = self._batch_timers.pop(url, None)
+            if timer is not None:
+                timer.cancel()
+            await self._flush_batch(url)
+        elif url not in self._batch_timers:
+            self._batch_timers[url] = asyncio.create_task(
+                self._flush_batch_later(url)
+            )
+
+    async def aclose(self):
+        """Delivers queued notifications and stops the delivery engine."""
+        timers = list(self._batch_timers.values())
+        self._batch_timers.clear()
+        for timer in timers:
+            timer.cancel()
+        await asyncio.gather(*timers, return_exceptions=True)
+        # Flushes already under way are waited for, as cancelling them would
+        # lose the batch they have taken.
+        await asyncio.gather(*self._batch_flushes, return_exceptions=True)
+        for url in list(self._batches):
+            await self._flush_batch(url)
+        await self.delivery.close()
+
+    async def _flush_batch_later(self, url: str):
+        await asyncio.sleep(self.batch_window)
+        self._batch_timers.pop(url, None)
+        task = asyncio.current_task()
+        self._batch_flushes.add(task)
+        try:
+            await self._flush_batch(url)
+        finally:
+            self._batch_flushes.discard(task)
+
+    async def _flush_batch(self, url: str):
+        batch = self._batches.pop(url, None)
+        if batch:
+            await self.delivery.submit(
+                url, batch if len(batch) > 1 else batch[0]
+            )
+
+
+class ReplayCacheFullError(Exception):
+    """Raised when a token cannot be remembered without forgetting others.
+
+    `retry_after` is the number of seconds until the oldest remembered
+    tokens expire and make room.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__('Token replay cache is full')
+        self.retry_after = retry_after
+
+
+class TokenReplayCache:
+    """Remembers digests of accepted tokens until they expire.
+
+    Digests are grouped into buckets by token `iat`, so whole buckets are
+    dropped once every token in them is too old to be accepted anyway. Live
+    digests are never dropped early, as a forgotten token could be replayed:
+    while `max_entries` digests are live, new tokens are refused with
+    `ReplayCacheFullError` instead.
+    """
+
+    def __init__(
+        self,
+        max_age: float = MAX_TOKEN_AGE_SECONDS,
+        bucket_seconds: int = 30,
+        max_entries: int = 100_000,
+    ):
+        self.max_age = max_age
+        self.bucket_seconds = bucket_seconds
+        self.max_entries = max_entries
+        self._buckets: dict[int, set[bytes]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def check_and_add(self, token: str, iat: float) -> bool:
+        """Records a token; returns False if it was already seen.
+
+        Raises ReplayCacheFullError if the cache holds `max_entries` live
+        tokens.
+        """
+        digest = hashlib.sha256(token.encode()).digest()
+        if any(digest in bucket for bucket in self._buckets.values()):
+            return False
+        now = time.time()
+        self._prune(now)
+        if self._size >= self.max_entries:
+            oldest = min(self._buckets)
+            expires_at = (oldest + 1) * self.bucket_seconds + self.max_age
+            raise ReplayCacheFullError(max(expires_at - now, 1.0))
+        self._buckets.setdefault(int(iat) // self.bucket_seconds, set()).add(
+            digest
+        )
+        self._size += 1
+        return True
+
+    def _prune(self, now: float):
+        oldest = int(now - self.max_age) // self.bucket_seconds
+        for bucket in sorted(self._buckets):
+            if bucket >= oldest:
+                break
+            self._size -= len(self._buckets.pop(bucket))
 
 
 class PushNotificationReceiverAuth(PushNotificationAuth):
-    def __init__(self):
+    @staticmethod
+    def unbatch_push_notifications(data: Any) -> list[dict[str, Any]]:
+        """Returns the notifications in a verified request body.
+
+        Batched notifications arrive as a JSON array (with the
+        X-A2A-Notification-Batch header), single ones as an object.
+        """
+        return data if isinstance(data, list) else [data]
+
+    def __init__(self, replay_cache: TokenReplayCache | None = None):
         self.public_keys_jwks = []
-        self.jwks_client = None
+        self.jwks_client: JWKSCache | None = None
+        self.replay_cache = replay_cache or TokenReplayCache()
 
-    async def load_jwks(self, jwks_url: str):
-        self.jwks_client = PyJWKClient(jwks_url)
+    async def load_jwks(self, jwks_url: str, **cache_options: Any):
+        """Sets up the key cache for `jwks_url` and pre-fetches the keys."""
+        self.jwks_client = JWKSCache(jwks_url, **cache_options)
+        try:
+            await self.jwks_client.refresh()
+        except Exception as e:
+            # Keys are fetched again on the first notification.
+            logger.warning(f'Could not pre-fetch JWKS from {jwks_url}: {e}')
 
     async def verify_push_notification(self, request: Request) -> bool:
         auth_header = request.headers.get('Authorization')
@@ -121,26 +371,49 @@ class PushNotificationReceiverAuth(PushNotificationAuth):
             print('Invalid authorization header')
             return False
 
+        await self.read_push_notification(request)
+        return True
+
+    async def read_push_notification(self, request: Request) -> Any:
+        """Verifies a push-notification request and returns its parsed body.
+
+        The signed digest is checked against the raw body bytes, so the body
+        is hashed once and parsed once. Raises ValueError (or a
+        jwt.PyJWTError) if the request is not authentic.
+        """
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith(AUTH_HEADER_PREFIX):
+            raise ValueError('Invalid authorization header')
+
         token = auth_header[len(AUTH_HEADER_PREFIX) :]
-        signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+        signing_key = await self.jwks_client.get_signing_key_from_jwt(token)
 
         decode_token = jwt.decode(
             token,
             signing_key,
             options={'require': ['iat', 'request_body_sha256']},
-            algorithms=['RS256'],
+            algorithms=list(SIGNING_KEY_PARAMS),
         )
 
-        actual_body_sha256 = self._calculate_request_body_sha256(
-            await request.json()
-        )
-        if actual_body_sha256 != decode_token['request_body_sha256']:
+        body = await request.body()
+        data = json.loads(body)
+        expected_sha256 = decode_token['request_body_sha256']
+        if hashlib.sha256(body).hexdigest() != expected_sha256 and (
+            # Senders that did not send the canonical bytes they signed.
+            self._calculate_request_body_sha256(data) != expected_sha256
+        ):
             # Payload signature does not match the digest in signed token.
             raise ValueError('Invalid request body')
 
-        if time.time() - decode_token['iat'] > 60 * 5:
+        token_age = time.time() - decode_token['iat']
+        if token_age > MAX_TOKEN_AGE_SECONDS:
             # Do not allow push-notifications older than 5 minutes.
             # This is to prevent replay attack.
             raise ValueError('Token is expired')
+        if token_age < -MAX_CLOCK_SKEW_SECONDS:
+            raise ValueError('Token is issued in the future')
 
-        return True
+        if not self.replay_cache.check_and_add(token, decode_token['iat']):
+            raise ValueError('Token has already been used')
+
+        return data
@@ -0,0 +1,246 @@
+"""Pooled, retrying delivery of push notifications."""
+
+import asyncio
+import contextlib
+import logging
+import random
+import statistics
+import time
+import weakref
+
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=200, max_keepalive_connections=100, keepalive_expiry=30
+)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+
+# A single notification, or a batch of them sent as one JSON array.
+NotificationPayload = dict[str, Any] | list[dict[str, Any]]
+
+_shared_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Returns the pooled client for outbound webhook requests.
+
+    httpx connections are bound to the event loop they were opened on, so
+    there is one shared client per running loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS
+        )
+        _shared_clients[loop] = client
+    return client
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+@dataclass
+class DeadLetter:
+    """A notification that could not be delivered."""
+
+    url: str
+    data: NotificationPayload
+    error: str
+    attempts: int
+    failed_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class DeliveryStats:
+    """Delivery counters and recent end-to-end latencies (enqueue to 2xx)."""
+
+    delivered: int = 0
+    retries: int = 0
+    dead_lettered: int = 0
+    dropped: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=1024))
+
+    def summary(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        summary = {
+            'delivered': self.delivered,
+            'retries': self.retries,
+            'dead_lettered': self.dead_lettered,
+            'dropped': self.dropped,
+        }
+        if latencies:
+            summary['latency_p50'] = statistics.median(latencies)
+            summary['latency_p95'] = latencies[
+                min(len(latencies) - 1, int(len(latencies) * 0.95))
+            ]
+            summary['latency_max'] = latencies[-1]
+        return summary
+
+
+@dataclass
+class _Delivery:
+    url: str
+    data: NotificationPayload
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Destination:
+    semaphore: asyncio.Semaphore
+    # Deliveries holding or waiting for one of the host's slots.
+    users: int = 0
+
+
+class PushNotificationDelivery:
+    """Delivers push notifications in the background.
+
+    `send` performs a single attempt and raises on failure. Transport errors
+    and retryable status codes are retried with exponential backoff and
+    jitter; notifications that still fail end up in `dead_letters`. At most
+    `queue_size` notifications are pending (waiting or being delivered) at
+    once. Each is delivered by its own task, which first takes one of the
+    `per_destination` slots of its host and only then one of the
+    `max_in_flight` global slots, so a slow subscriber can hold at most its
+    own share of the global slots and never delays other hosts.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, NotificationPayload], Awaitable[Any]],
+        queue_size: int = 1000,
+        max_in_flight: int = 64,
+        per_destination: int = 4,
+        max_attempts: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        dead_letter_size: int = 1000,
+    ):
+        self.send = send
+        self.queue_size = queue_size
+        self.per_destination = per_destination
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = DeliveryStats()
+        self.dead_letters: deque[DeadLetter] = deque(maxlen=dead_letter_size)
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        # Only hosts with pending deliveries, so the map stays bounded.
+        self._destinations: dict[str, _Destination] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._space = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of notifications waiting or being delivered."""
+        return len(self._tasks)
+
+    async def submit(self, url: str, data: NotificationPayload):
+        """Queues a notification, waiting while the queue is full."""
+        while len(self._tasks) >= self.queue_size:
+            self._space.clear()
+            await self._space.wait()
+        self._start(_Delivery(url, data))
+
+    def submit_nowait(self, url: str, data: NotificationPayload) -> bool:
+        """Queues a notification; returns False and drops it if the queue is full."""
+        if len(self._tasks) >= self.queue_size:
+            self.stats.dropped += 1
+            logger.warning(
+                f'Push-notification queue full, dropped for URL {url}'
+            )
+            return False
+        self._start(_Delivery(url, data))
+        return True
+
+    async def join(self):
+        """Waits until every queued notification is delivered or dead-lettered."""
+        await self._idle.wait()
+
+    async def close(self, wait: bool = True):
+        if wait:
+            await self.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _start(self, delivery: _Delivery):
+        task = asyncio.create_task(self._deliver(delivery))
+        self._tasks.add(task)
+        self._idle.clear()
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        self._space.set()
+        if not self._tasks:
+            self._idle.set()
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, url: str):
+        host = urlsplit(url).netloc
+        destination = self._destinations.get(host)
+        if destination is None:
+            destination = _Destination(asyncio.Semaphore(self.per_destination))
+            self._destinations[host] = destination
+        destination.users += 1
+        try:
+            async with destination.semaphore, self._in_flight:
+                yield
+        finally:
+            destination.users -= 1
+            if not destination.users:
+                del self._destinations[host]
+
+    async def _deliver(self, delivery: _Delivery):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self._slot(delivery.url):
+                    await self.send(delivery.url, delivery.data)
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    self._dead_letter(delivery, e, attempt)
+                    return
+                self.stats.retries += 1
+                # Sleep without holding any slot so other notifications,
+                # to this host or others, are not held up.
+                await asyncio.sleep(self._retry_delay(e, attempt))
+            else:
+                self.stats.delivered += 1
+                self.stats.latencies.append(
+                    time.monotonic() - delivery.enqueued_at
+                )
+                return
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = error.response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _dead_letter(self, delivery: _Delivery, error: Exception, attempts: int):
+        self.stats.dead_lettered += 1
+        self.dead_letters.append(
+            DeadLetter(delivery.url, delivery.data, repr(error), attempts)
+        )
+        logger.warning(
+            f'Giving up on push-notification for URL {delivery.url} '
+            f'after {attempts} attempt(s): {error}'
+        )
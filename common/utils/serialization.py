@@ -0,0 +1,70 @@
+"""JSON serialization of the A2A models straight to bytes."""
+
+import weakref
+
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+# id(model) -> (weak reference to the model, serialized model), for models
+# frozen with `freeze_json`.
+_serialized: dict[int, tuple[weakref.ref, bytes]] = {}
+
+
+def dump_json(model: BaseModel) -> bytes:
+    """Serializes a model to compact JSON, leaving out None fields.
+
+    Runs the model class's compiled serializer directly, without building
+    the intermediate dict that `model_dump` followed by `json.dumps` does.
+    """
+    return model.__pydantic_serializer__.to_json(model, exclude_none=True)
+
+
+def freeze_json(model: BaseModel) -> bytes:
+    """Serializes a model and keeps the bytes for as long as it is alive.
+
+    For an event published to several streams: `dump_json_rpc_response`
+    splices these bytes in for it instead of serializing it again, so all
+    streams send the event as it was when frozen, even if the object is
+    modified afterwards. Freezing the object again takes a new snapshot.
+    """
+    key = id(model)
+    body = dump_json(model)
+    _serialized[key] = (weakref.ref(model, _forget(key)), body)
+    return body
+
+
+def _frozen_json(model: BaseModel) -> bytes:
+    cached = _serialized.get(id(model))
+    if cached is not None and cached[0]() is model:
+        return cached[1]
+    return dump_json(model)
+
+
+def dump_json_rpc_response(response: Any) -> bytes:
+    """Serializes a JSON-RPC response, reusing the bytes of its result.
+
+    A result frozen with `freeze_json` is spliced into the envelope as
+    frozen, so an event streamed to many subscribers is serialized once and
+    only the envelope with each subscriber's request id is built per
+    response. Otherwise the output is the same as `dump_json(response)`.
+    """
+    result = response.result
+    if response.error is not None or not isinstance(result, BaseModel):
+        return dump_json(response)
+    if response.id is None:
+        envelope = b'{"jsonrpc":"2.0","result":'
+    else:
+        envelope = b'{"jsonrpc":"2.0","id":%s,"result":' % to_json(response.id)
+    return b'%s%s}' % (envelope, _frozen_json(result))
+
+
+def _forget(key: int):
+    def callback(ref: weakref.ref):
+        cached = _serialized.get(key)
+        if cached is not None and cached[0] is ref:
+            _serialized.pop(key, None)
+
+    return callback
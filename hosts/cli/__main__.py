@@ -1,15 +1,11 @@
 import asyncio
 import base64
+import itertools
 import os
 import urllib
 import httpx
-import subprocess
-import sys
-from pathlib import Path
-import random
 import time
 import json
-from pathlib import Path
 from typing import Optional, Dict, Any
 
 from uuid import uuid4
@@ -20,6 +16,9 @@ from a2a.client import A2AClient, A2ACardResolver
 
 from a2a.types import (
     Part,
+    Message,
+    Task,
+    TaskState,
     TextPart,
     FilePart,
     FileWithBytes,
@@ -34,6 +33,9 @@ from a2a.types import (
     JSONRPCErrorResponse,
 )
 from common.utils.push_notification_auth import PushNotificationReceiverAuth
+from hosts.cli.pipeline import VideoPipeline
+from hosts.cli.prompts import Checkpoint, iter_jsonl_prompts, random_video_prompts
+from hosts.cli.uploads import create_upload_service, gcs_uri_from_url, youtube_uploader
 
 
 @click.command()
@@ -43,6 +45,19 @@ from common.utils.push_notification_auth import PushNotificationReceiverAuth
 @click.option("--use_push_notifications", default=False)
 @click.option("--push_notification_receiver", default="http://localhost:5000")
 @click.option("--header", multiple=True)
+@click.option("--count", default=None, type=int,
+              help="Number of videos to generate (default: 6, or all prompts in --prompts).")
+@click.option("--prompts", "prompts_path", default=None,
+              help="JSONL file with one {\"id\": ..., \"prompt\": ...} object per line.")
+@click.option("--checkpoint", "checkpoint_path", default=None,
+              help="File recording completed prompt ids (default: <prompts>.checkpoint.jsonl).")
+@click.option("--pipeline", is_flag=True, default=False,
+              help="Run generation, streaming and upload as concurrent stages.")
+@click.option("--submit_workers", default=2)
+@click.option("--stream_workers", default=6)
+@click.option("--upload_workers", default=2)
+@click.option("--queue_size", default=4)
+@click.option("--skip_upload", is_flag=True, default=False)
 async def cli(
     agent,
     session,
@@ -50,6 +65,15 @@ async def cli(
     use_push_notifications: bool,
     push_notification_receiver: str,
     header,
+    count: int | None,
+    prompts_path: str | None,
+    checkpoint_path: str | None,
+    pipeline: bool,
+    submit_workers: int,
+    stream_workers: int,
+    upload_workers: int,
+    queue_size: int,
+    skip_upload: bool,
 ):
     headers = {h.split("=")[0]: h.split("=")[1] for h in header}
     print(f"Will use headers: {headers}")
@@ -64,6 +88,7 @@ async def cli(
         notification_receiver_host = notif_receiver_parsed.hostname
         notification_receiver_port = notif_receiver_parsed.port
 
+        push_notification_listener = None
         if use_push_notifications:
             from hosts.cli.push_notification_listener import (
                 PushNotificationListener,
@@ -72,77 +97,156 @@ async def cli(
             notification_receiver_auth = PushNotificationReceiverAuth()
             await notification_receiver_auth.load_jwks(f"{agent}/.well-known/jwks.json")
 
+            # Runs in this event loop; notifications arrive while tasks stream.
             push_notification_listener = PushNotificationListener(
                 host=notification_receiver_host,
                 port=notification_receiver_port,
                 notification_receiver_auth=notification_receiver_auth,
+                on_notification=lambda notification: print(
+                    f"\npush notification received => \n{notification}\n"
+                ),
             )
-            push_notification_listener.start()
+            await push_notification_listener.start()
 
         client = A2AClient(httpx_client, agent_card=card)
 
-        continue_loop = True
         streaming = card.capabilities.streaming
         context_id = session if session > 0 else uuid4().hex
 
-        # Generate 6 videos with random number of animals
-        for i in range(6):
-            # Generate random attributes for the video
-            num_animals = random.randint(1, 5)
-            background_colors = ['blue', 'white', 'green', 'orange', 'yellow']
-            ground_types = ['grass', 'concrete', 'soil', 'leaves', 'sand']
-            
-            # Select random attributes
-            background = random.choice(background_colors)
-            ground = random.choice(ground_types)
-            
-            print(f"\n=========  Generating video {i+1}/6 ======== ")
-            print(f"Number of baby foxes: {num_animals}")
-            print(f"Background color: {background}")
-            print(f"Ground type: {ground}")
-            
-            # Create the enhanced prompt
-            kitten_prompt = (
-                f"Generate a video of {num_animals} baby foxes and a chicken playing together "
-                f"on {ground} with a {background} background. "
-                f"The scene should be bright, cheerful, and well-lit, with the animals "
-                f"clearly visible against the {background} background."
-            )
-            
-            # Send the prompt to generate the video
-            continue_loop, _, taskId = await completeTask(
+        if prompts_path:
+            prompts = iter_jsonl_prompts(prompts_path)
+            checkpoint_path = checkpoint_path or f"{prompts_path}.checkpoint.jsonl"
+        else:
+            prompts = random_video_prompts(count or 6)
+        checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        if checkpoint is not None:
+            prompts = checkpoint.pending(prompts)
+        if count is not None:
+            prompts = itertools.islice(prompts, count)
+
+        upload_service = None if skip_upload else create_upload_service(upload_workers)
+        upload = None if upload_service is None else youtube_uploader(upload_service)
+
+        try:
+            if upload_service is not None and upload_service.backlog_depth:
+                # Prompts of deferred uploads are already checkpointed, so the
+                # backlog is drained even if this run uploads nothing new.
+                print(f"[YOUTUBE] Resuming {upload_service.backlog_depth} deferred upload(s)")
+                await upload_service.start()
+            if pipeline:
+                if not streaming:
+                    print("Pipelined mode requires an agent that supports streaming.")
+                    return
+                await VideoPipeline(
+                    client,
+                    prompts,
+                    upload=upload,
+                    context_id=context_id,
+                    on_complete=(
+                        (lambda job: checkpoint.record(job.prompt_id, job.uris, job.task_id))
+                        if checkpoint is not None else None
+                    ),
+                    submit_workers=submit_workers,
+                    stream_workers=stream_workers,
+                    upload_workers=upload_workers,
+                    queue_size=queue_size,
+                ).run()
+                return
+
+            await run_sequential(
                 client,
+                prompts,
+                checkpoint,
                 streaming,
+                history,
                 use_push_notifications,
                 notification_receiver_host,
                 notification_receiver_port,
-                None,
                 context_id,
-                initial_prompt=kitten_prompt
+                upload,
+            )
+        finally:
+            if upload_service is not None:
+                await upload_service.close()
+            if checkpoint is not None:
+                checkpoint.close()
+            if push_notification_listener is not None:
+                await push_notification_listener.stop()
+
+
+async def run_sequential(
+    client: A2AClient,
+    prompts,
+    checkpoint: Checkpoint | None,
+    streaming,
+    history,
+    use_push_notifications: bool,
+    notification_receiver_host: str,
+    notification_receiver_port: int,
+    context_id,
+    upload,
+):
+    first = True
+    for prompt_id, kitten_prompt in prompts:
+        # Wait for 1 minute between consecutive videos
+        if not first:
+            print("\nWaiting 1 minute before generating the next video...")
+            await asyncio.sleep(60)  # 60 seconds = 1 minute
+        first = False
+
+        print(f"\n=========  Generating video {prompt_id} ======== ")
+        print(f"Prompt: {kitten_prompt}")
+
+        generated_uris = []
+        task_results = []
+        failed_uploads = []
+
+        async def tracked_upload(gcs_uri, prompt, failed_uploads=failed_uploads):
+            uploaded = await upload(gcs_uri, prompt)
+            if not uploaded:
+                failed_uploads.append(gcs_uri)
+            return uploaded
+
+        # Send the prompt to generate the video
+        continue_loop, _, taskId = await completeTask(
+            client,
+            streaming,
+            use_push_notifications,
+            notification_receiver_host,
+            notification_receiver_port,
+            None,
+            context_id,
+            initial_prompt=kitten_prompt,
+            upload=None if upload is None else tracked_upload,
+            video_uris=generated_uris,
+            task_results=task_results,
+        )
+
+        # Only checkpoint prompts whose videos were generated and uploaded,
+        # so a rerun retries everything else.
+        completed = bool(task_results) and (
+            task_results[-1].status.state == TaskState.completed
+        )
+        if continue_loop and taskId and completed and generated_uris:
+            print("\nVideo generation completed successfully!")
+            if checkpoint is not None and not failed_uploads:
+                checkpoint.record(prompt_id, generated_uris, taskId)
+        else:
+            print(f"\nPrompt {prompt_id} did not produce a video.")
+
+        if history and continue_loop:
+            print("========= history ======== ")
+            # Create a proper request object for history
+            history_request = GetTaskRequest(
+                params={
+                    'id': taskId,
+                    'history_length': 10
+                }
+            )
+            task_response = await client.get_task(history_request)
+            print(
+                task_response.model_dump_json(include={"result": {"history": True}})
             )
-            
-            # Video generation completed
-            if continue_loop and taskId:
-                print("\nVideo generation completed successfully!")
-                
-                # If it's not the last iteration, wait for 1 minute before the next video
-                if i < 5:
-                    print("\nWaiting 1 minute before generating the next video...")
-                    await asyncio.sleep(60)  # 60 seconds = 1 minute
-
-            if history and continue_loop:
-                print("========= history ======== ")
-                # Create a proper request object for history
-                history_request = GetTaskRequest(
-                    params={
-                        'id': taskId,
-                        'history_length': 10
-                    }
-                )
-                task_response = await client.get_task(history_request)
-                print(
-                    task_response.model_dump_json(include={"result": {"history": True}})
-                )
 
 
 async def completeTask(
@@ -154,12 +258,17 @@ async def completeTask(
     taskId,
     contextId,
     initial_prompt=None,
+    upload=None,
+    video_uris=None,
+    task_results=None,
 ):
     if initial_prompt is not None:
         prompt = initial_prompt
     else:
-        prompt = click.prompt(
-            "\nWhat do you want to send to the agent? (:q or quit to exit)"
+        # Prompt on a thread so the push notification listener keeps running.
+        prompt = await asyncio.to_thread(
+            click.prompt,
+            "\nWhat do you want to send to the agent? (:q or quit to exit)",
         )
         if prompt == ":q" or prompt == "quit":
             return False, None, None
@@ -259,49 +368,16 @@ async def completeTask(
                     # Extract GCS URI from the signed URL
                     uri = file_data.uri
                     print(f"[SUCCESS] Video available at: {uri}")
+                    if video_uris is not None:
+                        video_uris.append(uri)
                     print(f"[DEBUG] Full video URI: {uri}")
                     
-                    if 'storage.googleapis.com' in uri:
-                        # Convert signed URL to GCS URI
-                        try:
-                            path = uri.split('storage.googleapis.com', 1)[1].split('?')[0]
-                            gcs_uri = f"gs:/{path}"
-                            print(f"\n[VIDEO GENERATED] GCS URI: {gcs_uri}")
-                            
-                            # Upload to YouTube
+                    gcs_uri = gcs_uri_from_url(uri)
+                    if gcs_uri:
+                        print(f"\n[VIDEO GENERATED] GCS URI: {gcs_uri}")
+                        if upload is not None:
                             print("\n[YOUTUBE] Starting YouTube upload...")
-                            try:
-                                # Get the absolute path to the upload script
-                                script_dir = Path(__file__).parent.parent.parent
-                                upload_script = script_dir / "youtube-video-upload" / "upload_video_now.py"
-                                
-                                # Run the upload script
-                                # Generate dynamic metadata based on the task
-                                title = f"AI Generated Video: {prompt[:50]}..." if prompt else "AI Generated Video"
-                                description = f"Video generated from user prompt: {prompt}" if prompt else "AI Generated Video"
-                                tags = ["AI", "generated", "video", "content"]
-                                
-                                # Run the upload script with dynamic parameters
-                                result = subprocess.run(
-                                    [sys.executable, str(upload_script), gcs_uri, title, description] + tags,
-                                    capture_output=True,
-                                    text=True
-                                )
-                                
-                                # Print the output
-                                if result.stdout:
-                                    print(f"[YOUTUBE] {result.stdout}")
-                                if result.stderr:
-                                    print(f"[YOUTUBE ERROR] {result.stderr}")
-                                
-                                print(f"[YOUTUBE] Upload process completed with return code: {result.returncode}")
-                                
-                            except Exception as e:
-                                print(f"[YOUTUBE ERROR] Failed to start upload process: {e}")
-                            
-                        except Exception as e:
-                            print(f"[ERROR] Error parsing GCS URI: {e}")
-                            print(f"[DEBUG] Original URI: {uri}")
+                            await upload(gcs_uri, prompt)
                     else:
                         print(f"\n[VIDEO GENERATED] Non-GCS URI: {uri}")
                 
@@ -344,6 +420,8 @@ async def completeTask(
     if message:
         print(f"\n{message.model_dump_json(exclude_none=True)}")
         return True, contextId, taskId
+    if taskResult and task_results is not None:
+        task_results.append(taskResult)
     if taskResult:
         # Don't print the contents of a file.
         task_content = taskResult.model_dump_json(
@@ -371,6 +449,7 @@ async def completeTask(
                     notification_receiver_port,
                     taskId,
                     contextId,
+                    task_results=task_results,
                 ),
                 contextId,
                 taskId,
@@ -0,0 +1,258 @@
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+from a2a.client import A2AClient
+from a2a.types import (
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendConfiguration,
+    MessageSendParams,
+    SendStreamingMessageRequest,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+from hosts.cli.uploads import gcs_uri_from_url, video_uris
+
+
+_STREAM_END = object()
+
+
+@dataclass
+class StageStats:
+    """Per-item latency of one pipeline stage (queue wait excluded)."""
+
+    name: str
+    durations: list[float] = field(default_factory=list)
+    failures: int = 0
+
+    def summary(self) -> str:
+        if not self.durations:
+            return f"{self.name:<8} n=0    failures={self.failures}"
+        durations = sorted(self.durations)
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        return (
+            f"{self.name:<8} n={len(durations):<4} "
+            f"mean={statistics.fmean(durations):7.2f}s "
+            f"p50={statistics.median(durations):7.2f}s "
+            f"p95={p95:7.2f}s max={durations[-1]:7.2f}s "
+            f"failures={self.failures}"
+        )
+
+
+@dataclass
+class VideoJob:
+    prompt_id: str
+    prompt: str
+    task_id: str | None = None
+    uris: list[str] = field(default_factory=list)
+    state: TaskState | None = None
+    events: asyncio.Queue | None = None
+    pump: asyncio.Task | None = None
+    first_event: object = None
+    streamed: bool = False
+    pending_uploads: int = 0
+    upload_failed: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        """The task completed with videos and all of their uploads succeeded."""
+        return (
+            self.state == TaskState.completed
+            and bool(self.uris)
+            and not self.upload_failed
+        )
+
+
+class VideoPipeline:
+    """Runs prompt generation, task submission, stream consumption and upload
+    as separate asyncio stages connected by bounded queues.
+
+    Each stage has its own worker count, so slow generations only hold a
+    stream worker while submissions and uploads keep flowing.
+
+    A job is finished once its stream has ended and all of its uploads have
+    resolved; `on_complete` is then called for jobs that `succeeded`.
+    """
+
+    def __init__(
+        self,
+        client: A2AClient,
+        prompts: Iterable[tuple[str, str]],
+        upload: Callable[[str, str], Awaitable[bool]] | None,
+        context_id: str,
+        on_complete: Callable[[VideoJob], None] | None = None,
+        submit_workers: int = 2,
+        stream_workers: int = 6,
+        upload_workers: int = 2,
+        queue_size: int = 4,
+    ):
+        self.client = client
+        self.prompts = prompts
+        self.upload = upload
+        self.context_id = context_id
+        self.on_complete = on_complete
+        self.worker_counts = {
+            "submit": submit_workers,
+            "stream": stream_workers,
+            "upload": upload_workers,
+        }
+        self.queues: dict[str, asyncio.Queue] = {
+            name: asyncio.Queue(maxsize=queue_size) for name in self.worker_counts
+        }
+        self.stats = {
+            name: StageStats(name) for name in ("generate", "submit", "stream", "upload")
+        }
+        self.completed: list[VideoJob] = []
+
+    async def run(self) -> dict[str, StageStats]:
+        handlers = {
+            "submit": self._submit,
+            "stream": self._stream,
+            "upload": self._upload,
+        }
+        workers = {
+            name: [
+                asyncio.create_task(self._worker(name, handlers[name]))
+                for _ in range(max(1, count))
+            ]
+            for name, count in self.worker_counts.items()
+        }
+
+        started = time.monotonic()
+        await self._generate()
+        # Drain the stages in order: once a stage's queue is joined, every item
+        # it will ever hand downstream has already been enqueued there.
+        for name in ("submit", "stream", "upload"):
+            await self.queues[name].join()
+            for task in workers[name]:
+                task.cancel()
+            await asyncio.gather(*workers[name], return_exceptions=True)
+
+        self.print_summary(time.monotonic() - started)
+        return self.stats
+
+    def print_summary(self, wall_time: float):
+        print("\n========= pipeline summary ========")
+        for stats in self.stats.values():
+            print(stats.summary())
+        print(f"videos   {sum(len(job.uris) for job in self.completed)} in {wall_time:.1f}s")
+
+    async def _generate(self):
+        prompts = iter(self.prompts)
+        while True:
+            started = time.monotonic()
+            try:
+                prompt_id, prompt = next(prompts)
+            except StopIteration:
+                return
+            self.stats["generate"].durations.append(time.monotonic() - started)
+            await self.queues["submit"].put(VideoJob(prompt_id=prompt_id, prompt=prompt))
+
+    async def _worker(self, name: str, handler: Callable[[object], Awaitable[None]]):
+        queue = self.queues[name]
+        while True:
+            item = await queue.get()
+            started = time.monotonic()
+            try:
+                await handler(item)
+                self.stats[name].durations.append(time.monotonic() - started)
+            except Exception as e:
+                self.stats[name].failures += 1
+                print(f"[PIPELINE] {name} stage failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def _submit(self, job: VideoJob):
+        request = SendStreamingMessageRequest(
+            id=str(uuid4()),
+            params=MessageSendParams(
+                message=Message(
+                    role="user",
+                    parts=[TextPart(text=job.prompt)],
+                    messageId=str(uuid4()),
+                    contextId=self.context_id,
+                ),
+                configuration=MessageSendConfiguration(acceptedOutputModes=["text"]),
+            ),
+        )
+        # The SSE stream is read by a dedicated task so the underlying
+        # connection is only ever driven from one task; the stream stage
+        # consumes its events through a small bounded queue.
+        job.events = asyncio.Queue(maxsize=16)
+        job.pump = asyncio.create_task(self._pump(request, job.events))
+        job.first_event = await job.events.get()
+        if job.first_event is _STREAM_END or isinstance(job.first_event, Exception):
+            raise RuntimeError(f"prompt {job.prompt_id} was not accepted: {job.first_event}")
+        print(f"[PIPELINE] submitted prompt {job.prompt_id}")
+        await self.queues["stream"].put(job)
+
+    async def _pump(self, request: SendStreamingMessageRequest, events: asyncio.Queue):
+        try:
+            async for response in self.client.send_message_streaming(request):
+                await events.put(response.root)
+        except Exception as e:
+            await events.put(e)
+        finally:
+            await events.put(_STREAM_END)
+
+    async def _stream(self, job: VideoJob):
+        try:
+            await self._consume_events(job)
+        finally:
+            if not job.pump.done():
+                job.pump.cancel()
+        job.streamed = True
+        self._finish(job)
+
+    def _finish(self, job: VideoJob):
+        if not job.streamed or job.pending_uploads:
+            return
+        self.completed.append(job)
+        if self.on_complete is not None and job.succeeded:
+            self.on_complete(job)
+
+    async def _consume_events(self, job: VideoJob):
+        item = job.first_event
+        while item is not _STREAM_END:
+            if isinstance(item, Exception):
+                raise item
+            if isinstance(item, JSONRPCErrorResponse):
+                raise RuntimeError(f"prompt {job.prompt_id} failed: {item.error}")
+
+            event = item.result
+            if isinstance(event, Task):
+                job.task_id = event.id
+                job.state = event.status.state
+            elif isinstance(event, TaskStatusUpdateEvent):
+                job.task_id = event.taskId
+                job.state = event.status.state
+            elif isinstance(event, TaskArtifactUpdateEvent):
+                job.task_id = event.taskId
+                for uri in video_uris(event.artifact):
+                    job.uris.append(uri)
+                    print(f"[VIDEO GENERATED] prompt {job.prompt_id}: {uri}")
+                    gcs_uri = gcs_uri_from_url(uri)
+                    if gcs_uri and self.upload is not None:
+                        job.pending_uploads += 1
+                        await self.queues["upload"].put((job, gcs_uri))
+            item = await job.events.get()
+
+    async def _upload(self, item: tuple[VideoJob, str]):
+        job, gcs_uri = item
+        uploaded = False
+        try:
+            uploaded = await self.upload(gcs_uri, job.prompt)
+        finally:
+            job.upload_failed |= not uploaded
+            job.pending_uploads -= 1
+            self._finish(job)
+        if not uploaded:
+            raise RuntimeError(f"upload of {gcs_uri} failed")
@@ -0,0 +1,108 @@
+import json
+import os
+import random
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+
+BACKGROUND_COLORS = ["blue", "white", "green", "orange", "yellow"]
+GROUND_TYPES = ["grass", "concrete", "soil", "leaves", "sand"]
+
+
+def random_video_prompt() -> str:
+    """Builds a baby-foxes-and-chicken prompt with random variations."""
+    num_animals = random.randint(1, 5)
+    background = random.choice(BACKGROUND_COLORS)
+    ground = random.choice(GROUND_TYPES)
+    return (
+        f"Generate a video of {num_animals} baby foxes and a chicken playing together "
+        f"on {ground} with a {background} background. "
+        f"The scene should be bright, cheerful, and well-lit, with the animals "
+        f"clearly visible against the {background} background."
+    )
+
+
+def random_video_prompts(count: int) -> Iterator[tuple[str, str]]:
+    for i in range(count):
+        yield str(i + 1), random_video_prompt()
+
+
+def iter_jsonl_prompts(path: str | Path) -> Iterator[tuple[str, str]]:
+    """Lazily yields (prompt_id, prompt) pairs from a JSONL file.
+
+    Each line is an object with a `prompt` (or `body`/`text`) field and an
+    optional `id` (or `request_id`); the line number is used when no id is
+    given. The file is read line by line, so very large prompt sets are
+    never loaded into memory at once.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"[PROMPTS] Skipping invalid JSON on line {line_number}: {e}")
+                continue
+            prompt = record.get("prompt") or record.get("body") or record.get("text")
+            if not prompt:
+                print(f"[PROMPTS] Skipping line {line_number}: no prompt field")
+                continue
+            prompt_id = record.get("id") or record.get("request_id") or line_number
+            yield str(prompt_id), prompt
+
+
+class Checkpoint:
+    """Append-only JSONL record of completed prompts and their video URIs.
+
+    Every completed prompt is flushed and fsynced as its own line, so a crash
+    loses at most the prompts that were still in flight. Rerunning with the
+    same checkpoint skips every prompt id already recorded.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.completed: dict[str, list[str]] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write.
+                        continue
+                    self.completed[str(record["id"])] = record.get("uris", [])
+        self._file = None
+
+    def __contains__(self, prompt_id: str) -> bool:
+        return prompt_id in self.completed
+
+    def pending(self, prompts: Iterable[tuple[str, str]]) -> Iterator[tuple[str, str]]:
+        skipped = 0
+        for prompt_id, prompt in prompts:
+            if prompt_id in self.completed:
+                skipped += 1
+                continue
+            yield prompt_id, prompt
+        if skipped:
+            print(f"[CHECKPOINT] Skipped {skipped} already completed prompts")
+
+    def record(self, prompt_id: str, uris: list[str], task_id: str | None = None):
+        if self._file is None:
+            self._file = open(self.path, "a+", encoding="utf-8")
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")
+        self._file.write(
+            json.dumps({"id": prompt_id, "task_id": task_id, "uris": uris}) + "\n"
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.completed[prompt_id] = uris
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,63 +1,116 @@
 import asyncio
-import threading
-import traceback
+import contextlib
+import inspect
+import logging
+import math
+import os
 
-from common.utils.push_notification_auth import PushNotificationReceiverAuth
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, Self
+
+from common.utils.push_notification_auth import (
+    PushNotificationReceiverAuth,
+    ReplayCacheFullError,
+)
 from starlette.applications import Starlette
 from starlette.requests import Request
 from starlette.responses import Response
 
 
+logger = logging.getLogger(__name__)
+
+NotificationHandler = Callable[[dict[str, Any]], Awaitable[None] | None]
+
+
 class PushNotificationListener:
+    """Receives push notifications as a uvicorn server in the caller's loop.
+
+    Verified notifications are passed to `on_notification` if given, or put
+    on the bounded `notifications` queue otherwise (see `__aiter__`). While
+    the queue is full the listener answers 503, so senders retry later
+    instead of the listener buffering without limit.
+
+    Example:
+        async with PushNotificationListener(host, port, auth) as listener:
+            async for notification in listener:
+                ...
+    """
+
     def __init__(
         self,
         host,
         port,
         notification_receiver_auth: PushNotificationReceiverAuth,
+        on_notification: NotificationHandler | None = None,
+        queue_size: int = 1000,
     ):
         self.host = host
         self.port = port
         self.notification_receiver_auth = notification_receiver_auth
-        self.loop = asyncio.new_event_loop()
-        self.thread = threading.Thread(
-            target=lambda loop: loop.run_forever(), args=(self.loop,)
+        self.on_notification = on_notification
+        self.notifications: asyncio.Queue[dict[str, Any]] = asyncio.Queue(
+            maxsize=queue_size
         )
-        self.thread.daemon = True
-        self.thread.start()
+        self.app = self.create_app()
+        self.server = None
+        self._serve_task: asyncio.Task | None = None
 
-    def start(self):
-        try:
-            # Need to start server in separate thread as current thread
-            # will be blocked when it is waiting on user prompt.
-            asyncio.run_coroutine_threadsafe(
-                self.start_server(),
-                self.loop,
-            )
-            print('======= push notification listener started =======')
-        except Exception as e:
-            print(e)
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
 
-    async def start_server(self):
-        import uvicorn
+    async def __aexit__(self, *exc_info):
+        await self.stop()
 
-        self.app = Starlette()
-        self.app.add_route(
-            '/notify', self.handle_notification, methods=['POST']
-        )
-        self.app.add_route(
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        while True:
+            yield await self.notifications.get()
+
+    def create_app(self) -> Starlette:
+        app = Starlette()
+        app.add_route('/notify', self.handle_notification, methods=['POST'])
+        app.add_route(
             '/notify', self.handle_validation_check, methods=['GET']
         )
+        return app
+
+    async def start(self):
+        """Starts serving in the running loop and waits until it listens."""
+        import uvicorn
 
+        if self._serve_task is not None:
+            return
         config = uvicorn.Config(
-            self.app, host=self.host, port=self.port, log_level='critical'
+            self.app,
+            host=self.host,
+            port=self.port,
+            log_level='critical',
+            # Senders keep pooled connections open between notifications.
+            timeout_keep_alive=30,
+            backlog=2048,
         )
         self.server = uvicorn.Server(config)
-        await self.server.serve()
+        self._serve_task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            if self._serve_task.done():
+                # Surface startup errors such as the port being in use.
+                await self._serve_task
+                raise RuntimeError('push notification listener did not start')
+            await asyncio.sleep(0.01)
+        print('======= push notification listener started =======')
+
+    async def stop(self):
+        if self._serve_task is None:
+            return
+        self.server.should_exit = True
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._serve_task
+        self._serve_task = None
 
     async def handle_validation_check(self, request: Request):
         validation_token = request.query_params.get('validationToken')
-        print(
-            f'\npush notification verification received => \n{validation_token}\n'
+        logger.info(
+            f'Push notification verification received: {validation_token}'
         )
 
         if not validation_token:
@@ -66,17 +119,72 @@ class PushNotificationListener:
         return Response(content=validation_token, status_code=200)
 
     async def handle_notification(self, request: Request):
-        data = await request.json()
+        receiver_auth = self.notification_receiver_auth
         try:
-            if not await self.notification_receiver_auth.verify_push_notification(
-                request
-            ):
-                print('push notification verification failed')
-                return
+            data = await receiver_auth.read_push_notification(request)
+        except ReplayCacheFullError as e:
+            # The notification may be authentic; have the sender retry once
+            # the oldest remembered tokens have expired.
+            logger.warning(f'Deferring push notification: {e}')
+            return Response(
+                status_code=503,
+                headers={'Retry-After': str(math.ceil(e.retry_after))},
+            )
         except Exception as e:
-            print(f'error verifying push notification: {e}')
-            print(traceback.format_exc())
-            return
+            logger.warning(f'Error verifying push notification: {e}')
+            return Response(status_code=401)
+
+        notifications = receiver_auth.unbatch_push_notifications(data)
+        if self.on_notification is None:
+            if self.notifications.full():
+                return Response(status_code=503, headers={'Retry-After': '1'})
+            for notification in notifications:
+                # A batch may need to wait for the consumer to make room.
+                await self.notifications.put(notification)
+            return Response(status_code=200)
 
-        print(f'\npush notification received => \n{data}\n')
+        for notification in notifications:
+            result = self.on_notification(notification)
+            if inspect.isawaitable(result):
+                await result
         return Response(status_code=200)
+
+
+def create_app(
+    jwks_url: str | None = None,
+    on_notification: NotificationHandler | None = None,
+) -> Starlette:
+    """Standalone listener app, for running under uvicorn with workers:
+
+        PUSH_NOTIFICATION_JWKS_URL=http://agent/.well-known/jwks.json \\
+        uvicorn hosts.cli.push_notification_listener:create_app --factory \\
+            --workers 4
+
+    Each worker loads the JWKS at startup. Notifications are logged unless
+    `on_notification` is given.
+
+    Note that each worker process has its own TokenReplayCache, so with
+    several workers a replayed notification is only rejected if it reaches
+    the worker that accepted the original. Run a single worker where replays
+    must be rejected reliably.
+    """
+    jwks_url = jwks_url or os.environ['PUSH_NOTIFICATION_JWKS_URL']
+    receiver_auth = PushNotificationReceiverAuth()
+    listener = PushNotificationListener(
+        host=None,
+        port=None,
+        notification_receiver_auth=receiver_auth,
+        on_notification=on_notification or _log_notification,
+    )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_app):
+        await receiver_auth.load_jwks(jwks_url)
+        yield
+
+    listener.app.router.lifespan_context = lifespan
+    return listener.app
+
+
+def _log_notification(notification: dict[str, Any]):
+    logger.info(f'Push notification received: {notification}')
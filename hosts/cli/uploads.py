@@ -0,0 +1,82 @@
+import sys
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+
+YOUTUBE_UPLOAD_DIR = Path(__file__).parent.parent.parent / "youtube-video-upload"
+CREDENTIALS_PATH = Path(__file__).parent / "credentials.json"
+QUOTA_STATE_PATH = Path(__file__).parent / "upload_quota.json"
+YOUTUBE_TAGS = ["AI", "generated", "video", "content"]
+
+
+def gcs_uri_from_url(uri: str) -> str | None:
+    """Converts a (signed) storage.googleapis.com URL to a gs:// URI."""
+    if uri.startswith("gs://"):
+        return uri
+    if "storage.googleapis.com" not in uri:
+        return None
+    path = uri.split("storage.googleapis.com", 1)[1].split("?")[0]
+    return f"gs:/{path}"
+
+
+def video_uris(artifact) -> list[str]:
+    """Returns the URIs of all video file parts of an artifact."""
+    uris = []
+    for part in getattr(artifact, "parts", None) or []:
+        part = getattr(part, "root", None) or part
+        part_type = getattr(part, "type", None) or getattr(part, "kind", None)
+        if part_type != "file":
+            continue
+        file_data = getattr(part, "file", None)
+        mime_type = getattr(file_data, "mimeType", None) or ""
+        uri = getattr(file_data, "uri", None)
+        if "video/" in mime_type and uri:
+            uris.append(uri)
+    return uris
+
+
+def youtube_metadata(prompt: str | None) -> tuple[str, str]:
+    title = f"AI Generated Video: {prompt[:50]}..." if prompt else "AI Generated Video"
+    description = f"Video generated from user prompt: {prompt}" if prompt else "AI Generated Video"
+    return title, description
+
+
+def create_upload_service(workers: int = 2, queue_size: int = 8):
+    """Creates an in-process YouTube UploadService (started on first use)."""
+    if str(YOUTUBE_UPLOAD_DIR) not in sys.path:
+        sys.path.insert(0, str(YOUTUBE_UPLOAD_DIR))
+    from quota_scheduler import QuotaScheduler
+    from upload_service import UploadService
+
+    return UploadService(
+        credentials_path=str(CREDENTIALS_PATH),
+        workers=workers,
+        queue_size=queue_size,
+        scheduler=QuotaScheduler(str(QUOTA_STATE_PATH)),
+    )
+
+
+def youtube_uploader(upload_service) -> Callable[[str, str | None], Awaitable[bool]]:
+    """Returns an upload callback that sends GCS videos through the service."""
+    from upload_service import UploadDeferred
+
+    async def upload_to_youtube(gcs_uri: str, prompt: str | None) -> bool:
+        title, description = youtube_metadata(prompt)
+        try:
+            response = await upload_service.upload(
+                gcs_uri,
+                title,
+                description=description,
+                tags=YOUTUBE_TAGS,
+                privacy_status="public",
+            )
+        except UploadDeferred as e:
+            print(f"[YOUTUBE] {e}")
+            return True
+        except Exception as e:
+            print(f"[YOUTUBE ERROR] Upload of {gcs_uri} failed: {e}")
+            return False
+        print(f"[YOUTUBE] Uploaded {gcs_uri}: https://youtu.be/{response['id']}")
+        return True
+
+    return upload_to_youtube
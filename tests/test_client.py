@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import httpx
+
+from common.client.client import A2AClient
+from common.types import A2AClientError, SendTaskStreamingResponse
+
+
+MESSAGE = {'role': 'user', 'parts': [{'type': 'text', 'text': 'hi'}]}
+
+
+def sse_handler(request: httpx.Request) -> httpx.Response:
+    task_id = json.loads(request.content)['params']['id']
+    if task_id == 'malformed':
+        result = {'unexpected': True}
+    else:
+        result = {
+            'id': task_id,
+            'status': {'state': 'completed'},
+            'final': True,
+        }
+    event = json.dumps({'jsonrpc': '2.0', 'id': 1, 'result': result})
+    return httpx.Response(
+        200,
+        headers={'content-type': 'text/event-stream'},
+        content=f'data: {event}\n\n'.encode(),
+    )
+
+
+async def collect(payloads, concurrency):
+    httpx_client = httpx.AsyncClient(transport=httpx.MockTransport(sse_handler))
+    client = A2AClient(url='http://agent', httpx_client=httpx_client)
+    async with client:
+        return [
+            item
+            async for item in client.send_tasks_streaming(
+                payloads, concurrency=concurrency
+            )
+        ]
+
+
+def test_send_tasks_streaming_reports_unexpected_errors_per_task():
+    payloads = [
+        {'id': 'a', 'message': MESSAGE},
+        {'id': 'malformed', 'message': MESSAGE},
+        {'message': MESSAGE},  # No id.
+        {'id': 'b', 'message': MESSAGE},
+        {'id': 'c', 'message': MESSAGE},
+    ]
+    for concurrency in (1, 3):
+        results = dict(asyncio.run(collect(payloads, concurrency)))
+
+        assert set(results) == {'a', 'malformed', None, 'b', 'c'}
+        for task_id in ('a', 'b', 'c'):
+            assert isinstance(results[task_id], SendTaskStreamingResponse)
+        assert isinstance(results['malformed'], A2AClientError)
+        assert isinstance(results[None], A2AClientError)
+
+
+def test_send_tasks_streaming_closes_early_with_a_full_queue():
+    async def close_early():
+        httpx_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(sse_handler)
+        )
+        client = A2AClient(url='http://agent', httpx_client=httpx_client)
+        payloads = ({'id': str(i), 'message': MESSAGE} for i in range(100))
+        stream = client.send_tasks_streaming(payloads, concurrency=2)
+        await anext(stream)
+        await asyncio.sleep(0.1)  # Let the workers fill the queue.
+        await asyncio.wait_for(stream.aclose(), 2)
+
+    asyncio.run(close_early())
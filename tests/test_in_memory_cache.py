@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+import uuid
+
+from common.utils.in_memory_cache import InMemoryCache
+
+
+def new_cache(**limits) -> InMemoryCache:
+    # Caches are named singletons, so every test gets a name of its own.
+    return InMemoryCache(f'test-{uuid.uuid4()}', **limits)
+
+
+def test_evicts_least_recently_used_entries():
+    cache = new_cache(max_entries=3)
+    for key in 'abc':
+        cache.set(key, key)
+    cache.get('a')
+    cache.set('d', 'd')
+
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['a', 'c', 'd']
+    stats = cache.stats()
+    assert stats.entries == 3
+    assert stats.evictions == 1
+
+
+def test_evicts_to_stay_within_max_bytes():
+    cache = new_cache(max_entries=None, max_bytes=10_000)
+    for i in range(10):
+        cache.set(f'key-{i}', b'x' * 2_000)
+
+    stats = cache.stats()
+    assert stats.bytes <= 10_000
+    assert stats.evictions > 0
+    assert cache.get('key-9') is not None
+    assert cache.get('key-0') is None
+
+
+def test_does_not_store_values_larger_than_max_bytes():
+    cache = new_cache(max_bytes=1_000)
+    cache.set('small', 1)
+    cache.set('large', b'x' * 2_000)
+
+    assert cache.get('large') is None
+    assert cache.get('small') == 1
+
+
+def test_expired_entries_are_not_returned():
+    cache = new_cache()
+    cache.set('short', 1, ttl=0.05)
+    cache.set('long', 2, ttl=60)
+    time.sleep(0.1)
+
+    assert cache.get('short', 'missing') == 'missing'
+    assert cache.get('long') == 2
+
+
+def test_expired_entries_are_reclaimed_without_reads():
+    cache = new_cache()
+    for i in range(10):
+        cache.set(f'key-{i}', i, ttl=0.05)
+
+    deadline = time.monotonic() + 5
+    while cache.stats().entries and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert cache.stats().entries == 0
+
+
+def test_get_or_set_computes_once_for_concurrent_misses():
+    cache = new_cache()
+    calls = 0
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_set('key', compute))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == 1
+    assert results == ['value'] * 8
+
+
+def test_aget_or_set_survives_cancelling_the_first_caller():
+    cache = new_cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return 'value'
+
+    async def main():
+        first = asyncio.create_task(cache.aget_or_set('key', compute))
+        await asyncio.sleep(0)
+        others = [
+            asyncio.create_task(cache.aget_or_set('key', compute))
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(main()) == ['value'] * 4
+    assert calls == 1
+    assert cache.get('key') == 'value'
@@ -0,0 +1,74 @@
+import json
+
+from hosts.cli.prompts import Checkpoint, iter_jsonl_prompts
+
+
+def write_prompts(path, records):
+    path.write_text(
+        ''.join(json.dumps(record) + '\n' for record in records),
+        encoding='utf-8',
+    )
+
+
+def test_iter_jsonl_prompts_skips_invalid_lines(tmp_path):
+    path = tmp_path / 'prompts.jsonl'
+    path.write_text(
+        '{"id": "a", "prompt": "first"}\n'
+        '\n'
+        'not json\n'
+        '{"id": "b"}\n'
+        '{"request_id": "c", "body": "third"}\n'
+        '{"text": "fourth"}\n',
+        encoding='utf-8',
+    )
+
+    assert list(iter_jsonl_prompts(path)) == [
+        ('a', 'first'),
+        ('c', 'third'),
+        ('6', 'fourth'),
+    ]
+
+
+def test_checkpoint_resumes_after_the_completed_prompts(tmp_path):
+    prompts_path = tmp_path / 'prompts.jsonl'
+    write_prompts(
+        prompts_path, [{'id': str(i), 'prompt': f'p{i}'} for i in range(5)]
+    )
+    checkpoint_path = tmp_path / 'prompts.jsonl.checkpoint.jsonl'
+
+    checkpoint = Checkpoint(checkpoint_path)
+    for prompt_id, _ in checkpoint.pending(iter_jsonl_prompts(prompts_path)):
+        if prompt_id == '2':
+            break
+        checkpoint.record(prompt_id, [f'gs://bucket/{prompt_id}.mp4'])
+    checkpoint.close()
+
+    resumed = Checkpoint(checkpoint_path)
+    assert resumed.completed == {
+        '0': ['gs://bucket/0.mp4'],
+        '1': ['gs://bucket/1.mp4'],
+    }
+    assert list(resumed.pending(iter_jsonl_prompts(prompts_path))) == [
+        ('2', 'p2'),
+        ('3', 'p3'),
+        ('4', 'p4'),
+    ]
+
+
+def test_checkpoint_ignores_a_torn_final_line(tmp_path):
+    path = tmp_path / 'checkpoint.jsonl'
+    path.write_text(
+        '{"id": "1", "task_id": "t1", "uris": ["gs://b/1"]}\n{"id": "2", "ur',
+        encoding='utf-8',
+    )
+
+    checkpoint = Checkpoint(path)
+    assert '1' in checkpoint
+    assert '2' not in checkpoint
+
+    checkpoint.record('2', ['gs://b/2'], 't2')
+    checkpoint.close()
+    assert Checkpoint(path).completed == {
+        '1': ['gs://b/1'],
+        '2': ['gs://b/2'],
+    }
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from common.utils.jwks_cache import JWKSCache
+from common.utils.push_notification_auth import (
+    PushNotificationReceiverAuth,
+    PushNotificationSenderAuth,
+    ReplayCacheFullError,
+    TokenReplayCache,
+)
+from hosts.cli.push_notification_listener import PushNotificationListener
+
+
+NOTIFICATION = {'id': 'task-1', 'status': {'state': 'completed'}}
+
+
+def test_replay_cache_rejects_a_token_seen_before():
+    cache = TokenReplayCache()
+    now = time.time()
+
+    assert cache.check_and_add('token-1', now)
+    assert not cache.check_and_add('token-1', now)
+    assert cache.check_and_add('token-2', now)
+    assert len(cache) == 2
+
+
+def test_replay_cache_forgets_expired_tokens():
+    cache = TokenReplayCache(max_age=60, max_entries=2)
+    now = time.time()
+    assert cache.check_and_add('old', now - 120)
+
+    assert cache.check_and_add('new-1', now)
+    assert cache.check_and_add('new-2', now)
+    assert len(cache) == 2
+
+
+def test_full_replay_cache_refuses_instead_of_forgetting():
+    cache = TokenReplayCache(max_entries=2)
+    now = time.time()
+    assert cache.check_and_add('token-1', now)
+    assert cache.check_and_add('token-2', now)
+
+    with pytest.raises(ReplayCacheFullError) as error:
+        cache.check_and_add('token-3', now)
+    assert error.value.retry_after > 0
+    assert not cache.check_and_add('token-1', now)
+    assert not cache.check_and_add('token-2', now)
+
+
+async def post_notification(replay_cache, replays):
+    """Posts one signed notification `replays` times to a listener."""
+    sender = PushNotificationSenderAuth()
+    sender.generate_jwk('ES256')
+    jwks = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda _: httpx.Response(200, json={'keys': sender.public_keys})
+        )
+    )
+    receiver = PushNotificationReceiverAuth(replay_cache)
+    receiver.jwks_client = JWKSCache('http://agent/jwks', httpx_client=jwks)
+    received = []
+    listener = PushNotificationListener(
+        host=None,
+        port=None,
+        notification_receiver_auth=receiver,
+        on_notification=received.append,
+    )
+
+    body = sender._serialize_request_body(NOTIFICATION)
+    headers = {
+        'Authorization': f'Bearer {sender._generate_jwt_for_body(body)}',
+        'Content-Type': 'application/json',
+    }
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=listener.app)
+    ) as client:
+        responses = [
+            await client.post(
+                'http://listener/notify', content=body, headers=headers
+            )
+            for _ in range(replays)
+        ]
+    await jwks.aclose()
+    return responses, received
+
+
+def test_listener_rejects_a_replayed_notification():
+    responses, received = asyncio.run(
+        post_notification(TokenReplayCache(), replays=2)
+    )
+
+    assert [response.status_code for response in responses] == [200, 401]
+    assert received == [NOTIFICATION]
+
+
+def test_listener_defers_notifications_while_the_replay_cache_is_full():
+    replay_cache = TokenReplayCache(max_entries=1)
+    replay_cache.check_and_add('other-token', time.time())
+
+    responses, received = asyncio.run(post_notification(replay_cache, 1))
+
+    assert responses[0].status_code == 503
+    assert int(responses[0].headers['Retry-After']) > 0
+    assert received == []
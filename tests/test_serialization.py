@@ -0,0 +1,131 @@
+import asyncio
+
+import httpx
+
+from common.server.server import A2AServer
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    Artifact,
+    InternalError,
+    Message,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+    TaskArtifactUpdateEvent,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from common.utils.serialization import (
+    dump_json,
+    dump_json_rpc_response,
+    freeze_json,
+)
+
+
+def events(task_id: str) -> list:
+    return [
+        TaskStatusUpdateEvent(
+            id=task_id, status=TaskStatus(state=TaskState.WORKING)
+        ),
+        TaskArtifactUpdateEvent(
+            id=task_id,
+            artifact=Artifact(
+                parts=[TextPart(text='café ☃ "quoted"\n')]
+            ),
+        ),
+        TaskStatusUpdateEvent(
+            id=task_id,
+            status=TaskStatus(state=TaskState.COMPLETED),
+            final=True,
+        ),
+    ]
+
+
+class StreamingTaskManager(InMemoryTaskManager):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        task_id = request.params.id
+        await self.upsert_task(request.params)
+        queue = await self.setup_sse_consumer(task_id)
+
+        async def publish():
+            for event in events(task_id):
+                self.published.append(event)
+                await self.enqueue_events_for_sse(task_id, event)
+
+        asyncio.get_running_loop().create_task(publish())
+        return self.dequeue_events_for_sse(request.id, task_id, queue)
+
+
+def test_dump_json_rpc_response_matches_dump_json():
+    responses = [
+        SendTaskStreamingResponse(id=request_id, result=event)
+        for request_id in (1, 'request-1', None)
+        for event in events('task-1')
+    ]
+    responses.append(SendTaskStreamingResponse(id=1, error=InternalError()))
+
+    for response in responses:
+        assert dump_json_rpc_response(response) == dump_json(response)
+
+
+def test_frozen_event_is_streamed_as_published():
+    event = events('task-1')[0]
+    freeze_json(event)
+    published = dump_json(SendTaskStreamingResponse(id=1, result=event))
+
+    event.status = TaskStatus(state=TaskState.FAILED)
+    response = SendTaskStreamingResponse(id=1, result=event)
+    assert dump_json_rpc_response(response) == published
+
+    freeze_json(event)
+    assert dump_json_rpc_response(response) == dump_json(response)
+
+
+def test_event_that_is_not_frozen_is_serialized_afresh():
+    event = events('task-1')[0]
+    dump_json_rpc_response(SendTaskStreamingResponse(id=1, result=event))
+
+    event.status = TaskStatus(state=TaskState.FAILED)
+    response = SendTaskStreamingResponse(id=1, result=event)
+    assert dump_json_rpc_response(response) == dump_json(response)
+
+
+def test_server_streams_the_same_bytes_as_dump_json():
+    task_manager = StreamingTaskManager()
+    server = A2AServer(task_manager=task_manager)
+    request = SendTaskStreamingRequest(
+        id=7,
+        params=TaskSendParams(
+            id='task-1',
+            message=Message(role='user', parts=[TextPart(text='hi')]),
+        ),
+    )
+
+    async def stream() -> bytes:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=server.app)
+        ) as client:
+            response = await client.post(
+                'http://agent/', content=dump_json(request)
+            )
+            assert response.headers['content-type'].startswith(
+                'text/event-stream'
+            )
+            return response.content
+
+    body = asyncio.run(stream())
+    assert len(task_manager.published) == 3
+    assert body == b''.join(
+        b'data: %s\r\n\r\n'
+        % dump_json(SendTaskStreamingResponse(id=7, result=event))
+        for event in task_manager.published
+    )
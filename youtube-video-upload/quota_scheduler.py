@@ -0,0 +1,159 @@
+"""YouTube upload quota tracking and backlog scheduling for VideoGenA2A."""
+
+import asyncio
+import datetime
+import json
+import math
+import os
+from zoneinfo import ZoneInfo
+
+# Quota units charged per videos.insert call and the default daily project
+# quota of the YouTube Data API.
+VIDEO_INSERT_COST = 1600
+DEFAULT_DAILY_QUOTA = 10000
+# The YouTube Data API quota resets at midnight Pacific Time.
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+QUOTA_ERROR_REASONS = {'quotaExceeded', 'dailyLimitExceeded', 'uploadLimitExceeded'}
+
+
+class QuotaScheduler:
+    """Tracks the daily upload quota and keeps a persistent upload backlog.
+
+    Units are reserved before every upload. Once the day's budget is spent,
+    or YouTube reports that the quota is exhausted, further uploads are added
+    to a backlog stored on disk and can be drained after the quota resets,
+    even by a later process.
+    """
+
+    def __init__(
+        self,
+        state_path: str = 'upload_quota.json',
+        daily_quota: int = DEFAULT_DAILY_QUOTA,
+        insert_cost: int = VIDEO_INSERT_COST
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            state_path: JSON file holding the units spent today and the backlog.
+            daily_quota: Quota units available per day.
+            insert_cost: Quota units charged per uploaded video.
+        """
+        self.state_path = state_path
+        self.daily_quota = daily_quota
+        self.insert_cost = insert_cost
+        self._state = self._load()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of uploads waiting for quota."""
+        return len(self._state['backlog'])
+
+    @property
+    def units_remaining(self) -> int:
+        self._roll_over()
+        if self._state['exhausted']:
+            return 0
+        return max(0, self.daily_quota - self._state['units_spent'])
+
+    def uploads_remaining_today(self) -> int:
+        return self.units_remaining // self.insert_cost
+
+    def try_reserve(self) -> bool:
+        """Reserve quota for one upload; False if today's budget is spent."""
+        if self.uploads_remaining_today() < 1:
+            return False
+        self._state['units_spent'] += self.insert_cost
+        self._save()
+        return True
+
+    def mark_exhausted(self) -> None:
+        """Record that YouTube rejected an upload for quota until the reset."""
+        self._roll_over()
+        self._state['exhausted'] = True
+        self._save()
+
+    def defer(self, job: dict) -> None:
+        """Add an upload to the persistent backlog."""
+        self._state['backlog'].append(job)
+        self._save()
+
+    def take_backlog(self, limit: int | None = None) -> list[dict]:
+        """Remove and return up to `limit` uploads from the backlog."""
+        backlog = self._state['backlog']
+        count = len(backlog) if limit is None else min(limit, len(backlog))
+        jobs, self._state['backlog'] = backlog[:count], backlog[count:]
+        if jobs:
+            self._save()
+        return jobs
+
+    def restore_backlog(self, jobs: list[dict]) -> None:
+        """Put uploads taken with `take_backlog` back at the front."""
+        if jobs:
+            self._state['backlog'][:0] = jobs
+            self._save()
+
+    def next_reset(self, now: datetime.datetime | None = None) -> datetime.datetime:
+        """The next quota reset as a timezone-aware datetime."""
+        now = (now or datetime.datetime.now(QUOTA_TIMEZONE)).astimezone(QUOTA_TIMEZONE)
+        tomorrow = now.date() + datetime.timedelta(days=1)
+        return datetime.datetime.combine(tomorrow, datetime.time(), tzinfo=QUOTA_TIMEZONE)
+
+    def eta(self, now: datetime.datetime | None = None) -> datetime.datetime | None:
+        """Estimated time by which the current backlog can be uploaded.
+
+        Returns None when the backlog is empty. Assumes the full daily quota
+        is available for the backlog on every following day.
+        """
+        depth = self.queue_depth
+        if depth == 0:
+            return None
+        now = now or datetime.datetime.now(QUOTA_TIMEZONE)
+        remaining = depth - self.uploads_remaining_today()
+        if remaining <= 0:
+            return now
+        per_day = max(1, self.daily_quota // self.insert_cost)
+        days = math.ceil(remaining / per_day)
+        return self.next_reset(now) + datetime.timedelta(days=days - 1)
+
+    async def wait_for_reset(self) -> None:
+        """Sleep until the quota resets."""
+        now = datetime.datetime.now(QUOTA_TIMEZONE)
+        # Allow for clock skew with YouTube's reset.
+        await asyncio.sleep((self.next_reset(now) - now).total_seconds() + 60)
+
+    @staticmethod
+    def is_quota_error(error: Exception) -> bool:
+        """Whether an exception is YouTube rejecting an upload for quota."""
+        resp = getattr(error, 'resp', None)
+        if resp is None or getattr(resp, 'status', None) not in (403, 429):
+            return False
+        details = getattr(error, 'error_details', None) or []
+        if isinstance(details, list):
+            reasons = {d.get('reason') for d in details if isinstance(d, dict)}
+            if reasons & QUOTA_ERROR_REASONS:
+                return True
+        return 'quota' in str(getattr(error, 'reason', '')).lower()
+
+    def _quota_day(self) -> str:
+        return datetime.datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    def _roll_over(self) -> None:
+        today = self._quota_day()
+        if self._state['day'] != today:
+            self._state.update(day=today, units_spent=0, exhausted=False)
+            self._save()
+
+    def _load(self) -> dict:
+        state = {'day': self._quota_day(), 'units_spent': 0, 'exhausted': False, 'backlog': []}
+        try:
+            with open(self.state_path) as f:
+                state.update(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        return state
+
+    def _save(self) -> None:
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self._state, f)
+        os.replace(temp_path, self.state_path)
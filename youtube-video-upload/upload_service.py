@@ -0,0 +1,264 @@
+"""In-process asynchronous upload service for VideoGenA2A."""
+
+import asyncio
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Self
+
+from quota_scheduler import QuotaScheduler
+from youtube_upload import YouTubeUploader
+
+
+class UploadDeferred(Exception):
+    """Raised for uploads moved to the quota backlog instead of running now."""
+
+
+@dataclass
+class UploadJob:
+    """A single GCS-to-YouTube upload request."""
+
+    gcs_uri: str
+    title: str
+    description: str = ""
+    category_id: str = "22"
+    tags: list | None = None
+    privacy_status: str = "private"
+    future: asyncio.Future | None = field(default=None, repr=False)
+
+    def to_record(self) -> dict:
+        """The job as a JSON-serializable backlog record."""
+        return {
+            f.name: getattr(self, f.name) for f in fields(self) if f.name != 'future'
+        }
+
+
+class UploadService:
+    """Runs YouTube uploads on a pool of workers inside the current process.
+
+    OAuth credentials are loaded once in `start()` and shared by all workers.
+    Jobs go through a bounded queue, so `submit()` applies backpressure when
+    uploads fall behind. Each worker runs its uploads on its own thread;
+    YouTubeUploader keeps one API client per thread.
+
+    With a QuotaScheduler, every upload first reserves quota. Uploads beyond
+    the daily budget, or rejected by YouTube for quota, fail with
+    UploadDeferred and are kept in the scheduler's persistent backlog, which
+    the service drains whenever it is running and quota is available.
+
+    Example:
+        async with UploadService(workers=2) as service:
+            future = await service.submit('gs://bucket/video.mp4', 'Title')
+            response = await future
+    """
+
+    def __init__(
+        self,
+        credentials_path: str = 'credentials.json',
+        token_path: str = 'token.pickle',
+        workers: int = 2,
+        queue_size: int = 8,
+        scheduler: QuotaScheduler | None = None
+    ):
+        """Initialize the service.
+
+        Args:
+            credentials_path: Path to the OAuth 2.0 credentials JSON file.
+            token_path: Path to store the user's access and refresh tokens.
+            workers: Number of uploads that may run at the same time.
+            queue_size: Number of submitted jobs that may wait for a worker.
+            scheduler: Optional quota scheduler that defers uploads beyond
+                the daily quota to a persistent backlog.
+        """
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self.workers = max(1, workers)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._executor: ThreadPoolExecutor | None = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._drain_task: asyncio.Task | None = None
+        # Set once the backlog jobs the current quota allows are queued.
+        self._backlog_queued = asyncio.Event()
+        self._uploader: YouTubeUploader | None = None
+        self.scheduler = scheduler
+
+    @property
+    def backlog_depth(self) -> int:
+        """Number of uploads waiting in the quota backlog."""
+        return self.scheduler.queue_depth if self.scheduler is not None else 0
+
+    def backlog_eta(self) -> datetime.datetime | None:
+        """Estimated time by which the quota backlog will have been uploaded."""
+        return self.scheduler.eta() if self.scheduler is not None else None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Authenticate once and start the worker tasks."""
+        if self._worker_tasks:
+            return
+        self._uploader = await asyncio.to_thread(
+            YouTubeUploader, self.credentials_path, self.token_path
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='youtube-upload'
+        )
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        if self.scheduler is not None:
+            self._drain_task = asyncio.create_task(self._drain_backlog())
+
+    async def submit(
+        self,
+        gcs_uri: str,
+        title: str,
+        description: str = "",
+        category_id: str = "22",
+        tags: list | None = None,
+        privacy_status: str = "private"
+    ) -> asyncio.Future:
+        """Queue an upload and return a future for the YouTube API response.
+
+        Waits only while the job queue is full, not for the upload itself.
+        The future fails with UploadDeferred if the upload was moved to the
+        quota backlog.
+        """
+        if not self._worker_tasks:
+            await self.start()
+        job = UploadJob(
+            gcs_uri=gcs_uri,
+            title=title,
+            description=description,
+            category_id=category_id,
+            tags=tags,
+            privacy_status=privacy_status,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        await self._queue.put(job)
+        return job.future
+
+    async def upload(self, gcs_uri: str, title: str, **kwargs) -> dict:
+        """Queue an upload and wait for its YouTube API response."""
+        return await (await self.submit(gcs_uri, title, **kwargs))
+
+    async def close(self, wait: bool = True) -> None:
+        """Stop the workers, by default after the queued jobs have finished.
+
+        By default this includes the backlog uploads that the remaining quota
+        allows, so a run that only drains the backlog uploads it. With
+        `wait=False`, jobs that have not started are moved to the quota
+        backlog if there is a scheduler (their futures fail with
+        UploadDeferred) and cancelled otherwise. Futures of uploads still
+        running are cancelled.
+        """
+        if self._drain_task is not None:
+            if wait:
+                await self._backlog_queued.wait()
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+        if wait:
+            await self._queue.join()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        # Jobs that never started go (back) to the backlog on disk.
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            self._queue.task_done()
+            if self.scheduler is not None:
+                self._defer(job)
+            elif job.future is not None:
+                job.future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                if self.scheduler is not None and not self.scheduler.try_reserve():
+                    self._defer(job)
+                    continue
+                response = await loop.run_in_executor(
+                    self._executor, self._run_job, job
+                )
+            except asyncio.CancelledError:
+                if job.future is not None:
+                    job.future.cancel()
+                raise
+            except Exception as e:  # noqa: BLE001 - failed through the job's future
+                if self.scheduler is not None and QuotaScheduler.is_quota_error(e):
+                    self.scheduler.mark_exhausted()
+                    self._defer(job)
+                else:
+                    self._resolve(job, error=e)
+            else:
+                self._resolve(job, response=response)
+            finally:
+                self._queue.task_done()
+
+    async def _drain_backlog(self) -> None:
+        # Runs once at start-up and then after every quota reset, queueing as
+        # many backlog jobs as the remaining quota allows.
+        while True:
+            self._backlog_queued.clear()
+            records = []
+            queued = 0
+            try:
+                limit = self.scheduler.uploads_remaining_today()
+                records = self.scheduler.take_backlog(limit)
+                for record in records:
+                    await self._queue.put(UploadJob(**record))
+                    queued += 1
+            finally:
+                self._backlog_queued.set()
+                # Records not queued when close() cancels us stay on disk.
+                self.scheduler.restore_backlog(records[queued:])
+            await self.scheduler.wait_for_reset()
+
+    def _defer(self, job: UploadJob) -> None:
+        self.scheduler.defer(job.to_record())
+        eta = self.scheduler.eta()
+        error = UploadDeferred(
+            f"Upload quota exhausted; {job.gcs_uri} is queued in the backlog "
+            f"(depth {self.scheduler.queue_depth}, ETA {eta:%Y-%m-%d %H:%M %Z})"
+        )
+        self._resolve(job, error=error)
+
+    @staticmethod
+    def _resolve(
+        job: UploadJob,
+        response: dict | None = None,
+        error: Exception | None = None
+    ) -> None:
+        if job.future is None:
+            # Jobs drained from the backlog have no caller waiting on them.
+            if error is None:
+                print(f"Uploaded backlog video {job.gcs_uri}: https://youtu.be/{response['id']}")
+            elif not isinstance(error, UploadDeferred):
+                print(f"Warning: backlog upload of {job.gcs_uri} failed: {error}")
+        elif not job.future.done():
+            if error is None:
+                job.future.set_result(response)
+            else:
+                job.future.set_exception(error)
+
+    def _run_job(self, job: UploadJob) -> dict:
+        return self._uploader.upload_from_gcs(
+            gcs_uri=job.gcs_uri,
+            title=job.title,
+            description=job.description,
+            category_id=job.category_id,
+            tags=job.tags,
+            privacy_status=job.privacy_status
+        )
@@ -1,13 +1,21 @@
+import functools
 import os
 import sys
 from youtube_upload import YouTubeUploader
 
-def upload_video_now(gcs_uri, title=None, description=None, tags=None):
-    print("Commencing GCS upload...")
+
+@functools.cache
+def _get_uploader():
+    """Create the uploader once; later calls reuse its credentials and client."""
     # Get the project root directory (one level up from the current file's directory)
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     credentials_path = os.path.join(project_root, 'hosts', 'cli', 'credentials.json')
-    uploader = YouTubeUploader(credentials_path=credentials_path)
+    return YouTubeUploader(credentials_path=credentials_path)
+
+
+def upload_video_now(gcs_uri, title=None, description=None, tags=None):
+    print("Commencing GCS upload...")
+    uploader = _get_uploader()
     
     try:
         response = uploader.upload_from_gcs(
@@ -1,54 +1,356 @@
 """YouTube Video Uploader for VideoGenA2A."""
 
+import datetime
+import hashlib
+import io
+import json
 import os
 import pickle
-from typing import Optional
-from google_auth_oauthlib.flow import InstalledAppFlow
+import queue
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import ClassVar
+
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import DISCOVERY_URI, build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 
 # If modifying these scopes, delete the file token.pickle.
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
+# Resumable upload chunks must be a multiple of 256 KiB.
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_RETRIES = 8
+MAX_RETRY_DELAY_SECONDS = 64
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+# YouTube keeps resumable upload sessions for about a week.
+SESSION_MAX_AGE_SECONDS = 6 * 24 * 3600
+
+ProgressCallback = Callable[[int, int], None]
+
+# Credentials are refreshed this long before they expire, so an upload never
+# starts with a token that runs out halfway through.
+CREDENTIALS_REFRESH_MARGIN_SECONDS = 300
+DISCOVERY_DOCUMENT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'youtube_v3_discovery.json'
+)
+
+_credentials_cache: dict = {}
+_credentials_lock = threading.RLock()
+_discovery_document: str | None = None
+_thread_services = threading.local()
+
+
+def get_credentials(credentials_path: str = 'credentials.json', token_path: str = 'token.pickle'):
+    """Return process-wide OAuth credentials for a token file.
+
+    Credentials are loaded (or obtained through the browser flow) once per
+    token file and then reused by every uploader in the process. They are
+    refreshed proactively when they are about to expire.
+
+    Args:
+        credentials_path: Path to the OAuth 2.0 credentials JSON file.
+        token_path: Path to store the user's access and refresh tokens.
+    """
+    key = os.path.abspath(token_path)
+    with _credentials_lock:
+        creds = _credentials_cache.get(key)
+        if creds is None:
+            creds = _load_credentials(credentials_path, token_path)
+            _credentials_cache[key] = creds
+        else:
+            refresh_credentials_if_expiring(creds, token_path)
+        return creds
+
+
+def refresh_credentials_if_expiring(creds, token_path: str | None = None) -> None:
+    """Refresh credentials that are invalid or expire within the margin."""
+    with _credentials_lock:
+        if creds.valid and creds.expiry is not None:
+            now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+            remaining = (creds.expiry - now).total_seconds()
+            if remaining > CREDENTIALS_REFRESH_MARGIN_SECONDS:
+                return
+        elif creds.valid:
+            return
+        if not creds.refresh_token:
+            return
+        creds.refresh(Request())
+        if token_path:
+            _save_credentials(creds, token_path)
+
+
+def get_youtube_service(credentials):
+    """Return a YouTube API client for the calling thread.
+
+    The client is built from a cached discovery document, so no network
+    request is needed. One client is kept per thread and credentials because
+    the underlying HTTP transport is not thread safe.
+    """
+    services = getattr(_thread_services, 'by_credentials', None)
+    if services is None:
+        services = _thread_services.by_credentials = {}
+    service = services.get(id(credentials))
+    if service is None or service[0] is not credentials:
+        service = (
+            credentials,
+            build_from_document(_get_discovery_document(), credentials=credentials)
+        )
+        services[id(credentials)] = service
+    return service[1]
+
+
+def _get_discovery_document() -> str:
+    """Load the YouTube discovery document once per process.
+
+    Uses the local copy if one was saved, else the document bundled with
+    google-api-python-client, and only fetches it over the network when
+    neither exists (saving it for later runs).
+    """
+    global _discovery_document
+    if _discovery_document is None:
+        with _credentials_lock:
+            if _discovery_document is None:
+                document = None
+                if os.path.exists(DISCOVERY_DOCUMENT_PATH):
+                    with open(DISCOVERY_DOCUMENT_PATH) as f:
+                        document = f.read()
+                if document is None:
+                    document = discovery_cache.get_static_doc('youtube', 'v3')
+                if document is None:
+                    import httplib2
+                    url = DISCOVERY_URI.format(api='youtube', apiVersion='v3')
+                    _, content = httplib2.Http().request(url)
+                    document = content.decode()
+                    with open(DISCOVERY_DOCUMENT_PATH, 'w') as f:
+                        f.write(document)
+                _discovery_document = document
+    return _discovery_document
+
+
+def _load_credentials(credentials_path: str, token_path: str):
+    """Load, refresh or obtain OAuth credentials for YouTube."""
+    creds = None
+    
+    # The file token.pickle stores the user's access and refresh tokens
+    if os.path.exists(token_path):
+        with open(token_path, 'rb') as token:
+            creds = pickle.load(token)
+    
+    # If there are no (valid) credentials available, let the user log in
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                credentials_path, SCOPES)
+            creds = flow.run_local_server(port=0)
+        
+        # Save the credentials for the next run
+        _save_credentials(creds, token_path)
+    
+    return creds
+
+
+def _save_credentials(creds, token_path: str) -> None:
+    with open(token_path, 'wb') as token:
+        pickle.dump(creds, token)
+
+
+class ResumableSessionStore:
+    """Persists resumable upload session URIs so a crashed upload can resume.
+
+    Sessions are stored in a small JSON file keyed by a fingerprint of the
+    upload source and metadata. Writes are atomic and serialized across the
+    threads of a process.
+    """
+
+    _locks: ClassVar[dict[str, threading.Lock]] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._locks_guard:
+            self._lock = self._locks.setdefault(os.path.abspath(path), threading.Lock())
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._load().get(key)
+        if entry and time.time() - entry['created'] < SESSION_MAX_AGE_SECONDS:
+            return entry['uri']
+        return None
+
+    def save(self, key: str, uri: str) -> None:
+        with self._lock:
+            sessions = self._load()
+            now = time.time()
+            sessions = {
+                k: v for k, v in sessions.items()
+                if now - v['created'] < SESSION_MAX_AGE_SECONDS
+            }
+            sessions[key] = {'uri': uri, 'created': now}
+            self._write(sessions)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            sessions = self._load()
+            if sessions.pop(key, None) is not None:
+                self._write(sessions)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, sessions: dict) -> None:
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(sessions, f)
+        os.replace(temp_path, self.path)
+
+
+class StreamingTransferError(Exception):
+    """Raised when a GCS object cannot be streamed straight to YouTube."""
+
+
+class GCSBlobStream(io.IOBase):
+    """Read-only file object that streams a GCS blob in fixed-size chunks.
+
+    A background thread downloads the blob range by range, up to `prefetch`
+    chunks ahead of the reader, so the download of the next chunk overlaps
+    with the upload of the current one and memory stays bounded at roughly
+    (prefetch + 1) * chunk_size.
+
+    Seeking is supported to the end (to report the size), forwards, and
+    backwards within the chunk currently held, which is what a chunked
+    resumable upload needs to resend a failed chunk.
+    """
+
+    def __init__(self, blob, chunk_size: int = DEFAULT_CHUNK_SIZE, prefetch: int = 2):
+        if blob.size is None:
+            blob.reload()
+        self._blob = blob
+        self._size = blob.size
+        self._chunk_size = chunk_size
+        self._chunks = queue.Queue(maxsize=prefetch)
+        self._buffer = b''
+        self._buffer_start = 0
+        self._position = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_END:
+            target = self._size + offset
+        elif whence == io.SEEK_CUR:
+            target = self._position + offset
+        else:
+            target = offset
+        if target < self._buffer_start:
+            raise StreamingTransferError(
+                f"Cannot seek back to byte {target}; the stream only holds "
+                f"data from byte {self._buffer_start}"
+            )
+        self._position = min(target, self._size)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._position
+        data = bytearray()
+        while size > 0 and self._position < self._size:
+            while self._position >= self._buffer_start + len(self._buffer):
+                self._next_chunk()
+            offset = self._position - self._buffer_start
+            piece = self._buffer[offset:offset + size]
+            data += piece
+            self._position += len(piece)
+            size -= len(piece)
+        return bytes(data)
+
+    def close(self):
+        self._stopped.set()
+        super().close()
+
+    def _next_chunk(self):
+        if self._thread is None:
+            # A resumed upload starts mid-object; skip the chunks before it.
+            self._buffer_start = self._position - self._position % self._chunk_size
+            self._thread = threading.Thread(target=self._download, daemon=True)
+            self._thread.start()
+        chunk = self._chunks.get()
+        if isinstance(chunk, Exception):
+            raise StreamingTransferError(f"GCS download failed: {chunk}") from chunk
+        self._buffer_start += len(self._buffer)
+        self._buffer = chunk
+
+    def _download(self):
+        try:
+            for start in range(self._buffer_start, self._size, self._chunk_size):
+                end = min(start + self._chunk_size, self._size) - 1
+                chunk = self._blob.download_as_bytes(start=start, end=end)
+                if not self._put(chunk):
+                    return
+        except Exception as e:  # noqa: BLE001 - reported to the reading thread
+            self._put(e)
+
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
 
 class YouTubeUploader:
     """Handles authentication and uploading videos to YouTube."""
 
-    def __init__(self, credentials_path: str = 'credentials.json', token_path: str = 'token.pickle'):
+    def __init__(
+        self,
+        credentials_path: str = 'credentials.json',
+        token_path: str = 'token.pickle',
+        credentials=None,
+        session_path: str | None = None
+    ):
         """Initialize with paths to credentials and token files.
         
         Args:
             credentials_path: Path to the OAuth 2.0 credentials JSON file.
             token_path: Path to store the user's access and refresh tokens.
+            credentials: Already authorized credentials to reuse instead of
+                loading them from token_path.
+            session_path: Path of the file persisting resumable upload
+                sessions. Defaults to upload_sessions.json next to token_path.
         """
         self.credentials_path = credentials_path
         self.token_path = token_path
-        self.youtube = self._get_authenticated_service()
+        self.sessions = ResumableSessionStore(
+            session_path or os.path.join(os.path.dirname(token_path), 'upload_sessions.json')
+        )
+        self.credentials = credentials or get_credentials(credentials_path, token_path)
 
-    def _get_authenticated_service(self):
-        """Get authenticated YouTube API service."""
-        creds = None
-        
-        # The file token.pickle stores the user's access and refresh tokens
-        if os.path.exists(self.token_path):
-            with open(self.token_path, 'rb') as token:
-                creds = pickle.load(token)
-        
-        # If there are no (valid) credentials available, let the user log in
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_path, SCOPES)
-                creds = flow.run_local_server(port=0)
-            
-            # Save the credentials for the next run
-            with open(self.token_path, 'wb') as token:
-                pickle.dump(creds, token)
-        
-        return build('youtube', 'v3', credentials=creds)
+    @property
+    def youtube(self):
+        """The YouTube API client for the calling thread."""
+        return get_youtube_service(self.credentials)
 
     def upload_video(
         self,
@@ -56,10 +358,18 @@ class YouTubeUploader:
         title: str,
         description: str = "",
         category_id: str = "22",  # Category 22 is "People & Blogs"
-        tags: Optional[list] = None,
-        privacy_status: str = "private"  # or "public", "unlisted"
+        tags: list | None = None,
+        privacy_status: str = "private",  # or "public", "unlisted"
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: ProgressCallback | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES
     ) -> dict:
         """Upload a video to YouTube.
+
+        The file is sent in chunks. A failed chunk is retried with
+        exponential backoff, and the session URI is persisted so that a
+        later call for the same file and metadata resumes where the previous
+        process stopped instead of starting over.
         
         Args:
             file_path: Path to the video file to upload.
@@ -68,34 +378,111 @@ class YouTubeUploader:
             category_id: YouTube video category ID.
             tags: List of video tags.
             privacy_status: Privacy status of the video.
+            chunk_size: Chunk size in bytes (multiple of 256 KiB).
+            progress_callback: Called with (bytes_uploaded, total_bytes)
+                after every chunk.
+            max_retries: Retries per chunk before giving up.
             
         Returns:
             dict: The response from the YouTube API.
         """
-        if tags is None:
-            tags = []
-            
+        stat = os.stat(file_path)
+        source = f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        media = MediaFileUpload(file_path, chunksize=chunk_size, resumable=True)
+        return self._insert_video(
+            media, title, description, category_id, tags, privacy_status,
+            source=source,
+            progress_callback=progress_callback,
+            max_retries=max_retries
+        )
+
+    def _insert_video(
+        self,
+        media,
+        title: str,
+        description: str,
+        category_id: str,
+        tags: list | None,
+        privacy_status: str,
+        source: str,
+        progress_callback: ProgressCallback | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES
+    ) -> dict:
+        """Run a chunked, resumable videos.insert request for a media body.
+
+        `source` identifies the uploaded bytes; together with the metadata it
+        keys the persisted session used to resume an interrupted upload.
+        """
         body = {
             'snippet': {
                 'title': title,
                 'description': description,
-                'tags': tags,
+                'tags': tags or [],
                 'categoryId': category_id
             },
             'status': {
                 'privacyStatus': privacy_status
             }
         }
-        
-        media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
-        
+
+        refresh_credentials_if_expiring(self.credentials, self.token_path)
         request = self.youtube.videos().insert(
             part=",".join(body.keys()),
             body=body,
             media_body=media
         )
-        
-        return request.execute()
+
+        session_key = hashlib.sha256(
+            (source + json.dumps(body, sort_keys=True)).encode()
+        ).hexdigest()
+        saved_uri = self.sessions.get(session_key)
+        if saved_uri:
+            # Ask the server how much it already has before sending data.
+            request.resumable_uri = saved_uri
+            request._in_error_state = True
+
+        response = None
+        retries = 0
+        while response is None:
+            try:
+                status, response = request.next_chunk()
+            except HttpError as e:
+                if saved_uri and e.resp.status in (404, 410):
+                    # The saved session expired; start a new one.
+                    self.sessions.delete(session_key)
+                    saved_uri = None
+                    request.resumable_uri = None
+                    request.resumable_progress = 0
+                    request._in_error_state = False
+                    continue
+                if e.resp.status not in RETRYABLE_STATUS_CODES:
+                    raise
+                error = e
+            except OSError as e:
+                error = e
+            else:
+                retries = 0
+                if request.resumable_uri and request.resumable_uri != saved_uri:
+                    saved_uri = request.resumable_uri
+                    self.sessions.save(session_key, saved_uri)
+                if status is not None and progress_callback is not None:
+                    progress_callback(status.resumable_progress, status.total_size)
+                continue
+
+            if request.resumable_uri and request.resumable_uri != saved_uri:
+                saved_uri = request.resumable_uri
+                self.sessions.save(session_key, saved_uri)
+            retries += 1
+            if retries > max_retries:
+                raise error
+            delay = min(2 ** retries, MAX_RETRY_DELAY_SECONDS) * random.uniform(0.5, 1.0)
+            print(f"Warning: Upload chunk failed ({error}), retry {retries}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+        self.sessions.delete(session_key)
+        if progress_callback is not None:
+            progress_callback(media.size(), media.size())
+        return response
 
     def upload_from_gcs(
         self,
@@ -103,10 +490,18 @@ class YouTubeUploader:
         title: str,
         description: str = "",
         category_id: str = "22",
-        tags: Optional[list] = None,
-        privacy_status: str = "private"
+        tags: list | None = None,
+        privacy_status: str = "private",
+        streaming: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: ProgressCallback | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES
     ) -> dict:
         """Upload a video to YouTube from Google Cloud Storage.
+
+        By default the object is streamed from GCS straight into a chunked
+        resumable upload, without a local copy. If streaming is not possible,
+        the object is downloaded to a temporary file and uploaded from there.
         
         Args:
             gcs_uri: Google Cloud Storage URI (e.g., 'gs://bucket/path/to/video.mp4').
@@ -115,14 +510,16 @@ class YouTubeUploader:
             category_id: YouTube video category ID.
             tags: List of video tags.
             privacy_status: Privacy status of the video.
+            streaming: Stream the object instead of downloading it first.
+            chunk_size: Size of the streamed chunks in bytes (multiple of 256 KiB).
+            progress_callback: Called with (bytes_uploaded, total_bytes)
+                after every chunk.
+            max_retries: Retries per chunk before giving up.
             
         Returns:
             dict: The response from the YouTube API.
         """
-        # Download the file from GCS first
-        from google.cloud import storage
-        import tempfile
-        import os
+        from gcs_download import get_storage_client
         
         # Parse GCS URI
         if not gcs_uri.startswith('gs://'):
@@ -132,31 +529,67 @@ class YouTubeUploader:
         bucket_name = path_parts[0]
         blob_name = '/'.join(path_parts[1:])
         
-        # Download file to a temporary location
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
+        bucket = get_storage_client().bucket(bucket_name)
         blob = bucket.blob(blob_name)
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(blob_name)[1]) as temp_file:
-            blob.download_to_file(temp_file)
+        blob.reload()
+
+        # Both transfer paths upload the same bytes, so they share one
+        # resumable session per object generation.
+        upload_options = {
+            "title": title,
+            "description": description,
+            "category_id": category_id,
+            "tags": tags,
+            "privacy_status": privacy_status,
+            "source": f"{gcs_uri}#{blob.generation}",
+            "progress_callback": progress_callback,
+            "max_retries": max_retries,
+        }
+
+        if streaming:
+            try:
+                return self._upload_blob_streaming(blob, chunk_size, **upload_options)
+            except StreamingTransferError as e:
+                print(f"Warning: Streaming upload of {gcs_uri} failed ({e}), "
+                      "falling back to a temporary file")
+
+        return self._upload_blob_via_temp_file(blob, chunk_size, **upload_options)
+
+    def _upload_blob_streaming(self, blob, chunk_size: int, **upload_options) -> dict:
+        """Feed a GCS blob into a chunked resumable upload while it downloads."""
+        stream = GCSBlobStream(blob, chunk_size=chunk_size)
+        try:
+            media = MediaIoBaseUpload(
+                stream,
+                mimetype=blob.content_type or 'video/*',
+                chunksize=chunk_size,
+                resumable=True
+            )
+            return self._insert_video(media, **upload_options)
+        finally:
+            stream.close()
+
+    def _upload_blob_via_temp_file(self, blob, chunk_size: int, **upload_options) -> dict:
+        """Download a GCS blob to a temporary file, then upload that file."""
+        import tempfile
+
+        from gcs_download import download_blob
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(blob.name)[1]) as temp_file:
             temp_file_path = temp_file.name
         
         try:
+            download_blob(blob, temp_file_path)
             # Upload the downloaded file to YouTube
-            response = self.upload_video(
-                file_path=temp_file_path,
-                title=title,
-                description=description,
-                category_id=category_id,
-                tags=tags,
-                privacy_status=privacy_status
-            )
-            return response
+            media = MediaFileUpload(temp_file_path, chunksize=chunk_size, resumable=True)
+            return self._insert_video(media, **upload_options)
         finally:
             # Clean up the temporary file
             try:
                 os.unlink(temp_file_path)
-            except Exception as e:
+            except FileNotFoundError:
+                pass
+            except OSError as e:
                 print(f"Warning: Could not delete temporary file {temp_file_path}: {e}")
 
 